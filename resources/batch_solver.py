@@ -0,0 +1,104 @@
+from argparse import ArgumentParser
+import json
+from metrics import MetricsCollector, enable_metrics
+import sys
+from wordle import *
+
+USAGE_NOTES: str = ("Each input line is one game state, either JSON such as "
+                    '{"guesses": ["salet", "brond"], "colors": ["_y___", "yyy__"]} '
+                    "or plain text pairs such as: salet _y___ brond yyy__ . "
+                    "The JSON state {} asks for the first guess.")
+
+
+def parse_state(line: str) -> tuple:
+    """read (guesses, colors) from a JSON object or from whitespace separated guess/colors pairs"""
+    line: str = line.strip()
+    if line.startswith("{"):
+        record: dict = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("JSON states must be objects")
+        rows: list = [record.get("guesses", []), record.get("colors", [])]
+        if not all(isinstance(row, list) and all(isinstance(word, str) for word in row) for row in rows):
+            raise ValueError("guesses and colors must be lists of strings")
+        return [g.lower() for g in rows[0]], [c.lower() for c in rows[1]]
+    tokens: list = line.lower().split()
+    if len(tokens) % 2 != 0:
+        raise ValueError("plain text states need a color string after every guess")
+    return tokens[0::2], tokens[1::2]
+
+
+def solve_stream(wordle: Wordle, lines, output, top_k: int) -> int:
+    """write one JSON line of advice per input state, reusing the same warm game and solver
+
+    Keyword arguments:
+    - wordle: game holding the dictionary, pattern tables and solver
+    - lines: iterable of input states
+    - output: writable text stream for the JSON lines
+    - top_k: number of top scores to report per state
+    """
+    n_states: int = 0
+    for line in lines:
+        if line.strip() == "":
+            continue
+        n_states += 1
+        try:
+            guesses, colors = parse_state(line)
+            guess, n_candidates, top_scores = wordle.get_guide_suggestion(guesses, colors, top_n=top_k)
+            result: dict = {"guess": guess,
+                            "n_candidates": n_candidates,
+                            "top_scores": top_scores}
+        except (ValueError, TypeError, AttributeError) as e:
+            result: dict = {"error": str(e)}
+        output.write(json.dumps(result) + "\n")
+    output.flush()
+    return n_states
+
+
+def main() -> None:
+    parser: ArgumentParser = ArgumentParser(description="recommend the next guess for a stream of guide mode states",
+                                            epilog=USAGE_NOTES)
+    parser.add_argument("--input", default="-", help="file of game states, - for stdin")
+    parser.add_argument("--output", default="-", help="file for the JSON lines, - for stdout")
+    parser.add_argument("--language", default="en", help="word list prefix in the data folder, e.g. en or fr")
+    parser.add_argument("--top-k", type=int, default=10, help="number of top scores to report")
+    parser.add_argument("--lookahead-top-k", type=int, default=0,
+                        help="rescore this many top guesses by the expected guesses they leave (0 for greedy single step)")
+    parser.add_argument("--lookahead-ms", type=float, default=WordleSolver.LOOKAHEAD_SECONDS * 1000,
+                        help="wall clock budget of each lookahead move")
+    parser.add_argument("--prefilter-top-m", type=int, default=0,
+                        help="only score this many guesses, ranked by letter coverage of the remaining answers "
+                             "(0 scores every guess)")
+    parser.add_argument("--sample-size", type=int, default=0,
+                        help="estimate entropies on growing samples of this many answers first and only score "
+                             "the guesses that may still be best exactly (0 scores every guess exactly)")
+    parser.add_argument("--sample-seed", type=int, default=None, help="seed of the sampled scoring")
+    parser.add_argument("--metrics", default=None,
+                        help="write hot path timings here, as Prometheus text for .prom files and JSON otherwise")
+    args = parser.parse_args()
+    metrics: MetricsCollector = enable_metrics() if args.metrics is not None else None
+
+    answer_words, allowed_words = load_language_words(args.language, Wordle.WORDLE_LENGTH)
+    wordle: Wordle = Wordle(answer_words=answer_words,
+                            allowed_words=allowed_words,
+                            show_output=False,
+                            save_solver_results=False,
+                            lookahead_top_k=args.lookahead_top_k,
+                            lookahead_seconds=args.lookahead_ms / 1000,
+                            prefilter_top_m=args.prefilter_top_m,
+                            sample_size=args.sample_size,
+                            sample_seed=args.sample_seed)
+    input_file = sys.stdin if args.input == "-" else open(args.input, "r")
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        solve_stream(wordle, input_file, output_file, args.top_k)
+    finally:
+        if metrics is not None:
+            metrics.write(args.metrics)
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+
+if __name__ == "__main__":
+    main()
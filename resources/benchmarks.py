@@ -0,0 +1,254 @@
+from argparse import ArgumentParser
+import json
+import numpy as np
+from patterns import get_colors_from_pattern
+import platform
+import random
+from strategy import load_opening_book
+import sys
+import time
+from wordle_sim_stats import *
+
+BENCHMARK_SEED: int = 2022
+N_POSITION_ANSWERS: int = 5
+N_ENTROPY_GUESSES: int = 100
+N_SIMULATED_GAMES: int = 40
+N_MULTI_BOARD_GAMES: int = 5
+N_BOARDS: int = 4
+DEFAULT_REPEAT: int = 3
+DEFAULT_TOLERANCE: float = 0.25
+PREFILTER_TOP_M: int = 300
+BENCHMARK_NAMES: tuple = ("entropy_score",
+                          "optimal_guess_2",
+                          "optimal_guess_3",
+                          "update_word_sets",
+                          "letter_stats_df",
+                          "simulate_games",
+                          "simulate_multi_board")
+# benchmarks whose first call lazily imports scipy or pandas, run once untimed first
+WARM_UP_BENCHMARKS: tuple = ("entropy_score", "letter_stats_df")
+
+
+class LanguageBenchmarks:
+    """Fixed-seed workloads on one language's word lists, one method per benchmark
+
+    Every answer, guess and game position is chosen from the seed up front, so each
+    run times exactly the same work.
+    """
+
+    def __init__(self, language: str, seed: int = BENCHMARK_SEED) -> None:
+        self.language: str = language
+        answer_words, allowed_words = load_language_words(language, Wordle.WORDLE_LENGTH)
+        self.game: Wordle = Wordle(answer_words=answer_words,
+                                   allowed_words=allowed_words,
+                                   show_output=False,
+                                   is_automated=True,
+                                   use_hints=False,
+                                   save_solver_results=False)
+        opening_book: StrategyTree = load_opening_book(self.game.pattern_matrix)
+        self.first_guess: str = opening_book.first_guess if opening_book is not None else \
+            WordleSolver.OPTIMAL_FIRST_GUESS
+        rng: random.Random = random.Random(seed)
+        answers: list = sorted(self.game.original_answer_words)
+        self.position_answers: list = rng.sample(answers, N_POSITION_ANSWERS)
+        self.entropy_guesses: list = rng.sample(sorted(self.game.original_allowed_words), N_ENTROPY_GUESSES)
+        self.simulated_answers: list = sorted(rng.sample(answers, N_SIMULATED_GAMES))
+        self.multi_board_seed: int = rng.randrange(1 << 32)
+        self.multi_board_game: MultiBoardWordle = MultiBoardWordle(answer_words=self.game.original_answer_words,
+                                                                   allowed_words=self.game.original_allowed_words,
+                                                                   n_boards=N_BOARDS,
+                                                                   show_output=False)
+        # (answer words, allowed words) left after the solver's first one and two guesses
+        self.positions: dict = {n_rows: [self.__get_position(answer, n_rows) for answer in self.position_answers]
+                                for n_rows in (1, 2)}
+
+    def __get_position(self, answer: str, n_rows: int) -> tuple:
+        self.game.reset()
+        self.game.answer = answer
+        self.game._Wordle__setup_solver()
+        for _ in range(n_rows):
+            self.game.play_next_guess()
+        position: tuple = (self.game.answer_words, self.game.allowed_words)
+        self.game.reset()
+        return position
+
+    def __get_solver(self, answer_words, allowed_words, guess_n: int) -> WordleSolver:
+        """a solver that really scores: no opening book, no cached positions"""
+        return WordleSolver(answer_words, allowed_words, guess_n, None, False,
+                            pattern_matrix=self.game.pattern_matrix,
+                            use_cache=False,
+                            use_opening_book=False)
+
+    def entropy_score(self) -> None:
+        """the legacy single guess score of N_ENTROPY_GUESSES guesses against every answer"""
+        solver: WordleSolver = self.__get_solver(self.game.original_answer_words, self.game.original_allowed_words, 1)
+        for guess in self.entropy_guesses:
+            solver._WordleSolver__entropy_score(guess)
+
+    def optimal_guess_2(self) -> None:
+        """a full get_optimal_guess after one guess, for every fixed answer"""
+        for answer_words, allowed_words in self.positions[1]:
+            self.__get_solver(answer_words, allowed_words, 2).get_optimal_guess(game_mode="answer_unknown")
+
+    def optimal_guess_3(self) -> None:
+        """a full get_optimal_guess after two guesses, for every fixed answer"""
+        for answer_words, allowed_words in self.positions[2]:
+            self.__get_solver(answer_words, allowed_words, 3).get_optimal_guess(game_mode="answer_unknown")
+
+    def update_word_sets(self) -> None:
+        """fold the colors of the first guess against every fixed answer into the full word sets"""
+        for answer in self.position_answers:
+            self.game.reset()
+            self.game.current_guess = self.first_guess
+            pattern: int = self.game.pattern_matrix.get_pattern(self.first_guess, answer)
+            self.game._Wordle__record_colors(get_colors_from_pattern(pattern, Wordle.WORDLE_LENGTH))
+        self.game.reset()
+
+    def letter_stats_df(self) -> None:
+        get_letter_stats_df(sorted(self.game.original_answer_words))
+
+    def simulate_games(self) -> None:
+        """simulate_all_games over N_SIMULATED_GAMES fixed answers, starting from an empty guess cache"""
+        WordleSolver.GUESS_CACHE.clear()
+        self.game.excluded_answers = set(self.game.original_answer_words) - set(self.simulated_answers)
+        self.game.reset()
+        SimulateGameStats(self.game).simulate_all_games(show_progress=False)
+        self.game.excluded_answers = set()
+        self.game.reset()
+
+    def simulate_multi_board(self) -> None:
+        """N_MULTI_BOARD_GAMES Quordle games against fixed answers"""
+        SimulateMultiBoardStats(self.multi_board_game).simulate_games(N_MULTI_BOARD_GAMES, self.multi_board_seed,
+                                                                      show_progress=False)
+
+    def get_prefilter_tradeoff(self, prefilter_top_m: int) -> dict:
+        """wall time and average guesses of the fixed answers' games, scoring every guess or only the top m
+
+        The opening book is left out, so every move after the first guess is scored.
+        """
+        tradeoff: dict = {"prefilter_top_m": prefilter_top_m}
+        for name, top_m in (("full", 0), ("prefiltered", prefilter_top_m)):
+            WordleSolver.GUESS_CACHE.clear()
+            game: Wordle = Wordle(answer_words=self.game.original_answer_words,
+                                  allowed_words=self.game.original_allowed_words,
+                                  show_output=False,
+                                  is_automated=True,
+                                  use_hints=False,
+                                  save_solver_results=False,
+                                  first_guess=self.first_guess,
+                                  prefilter_top_m=top_m,
+                                  use_opening_book=False)
+            game.excluded_answers = set(self.game.original_answer_words) - set(self.simulated_answers)
+            stats: SimulateGameStats = SimulateGameStats(game)
+            start: float = time.perf_counter()
+            stats.simulate_all_games_by_partition()
+            tradeoff[name] = {"seconds": time.perf_counter() - start, "avg_n_guesses": stats.avg_n_guesses}
+        tradeoff["speedup"] = tradeoff["full"]["seconds"] / tradeoff["prefiltered"]["seconds"]
+        tradeoff["extra_guesses"] = tradeoff["prefiltered"]["avg_n_guesses"] - tradeoff["full"]["avg_n_guesses"]
+        return tradeoff
+
+
+def time_benchmark(benchmark, repeat: int, warm_up: bool = False) -> dict:
+    """best and median wall time of repeated runs, or the error that stopped the benchmark
+
+    Keyword arguments:
+    - benchmark: the workload to time
+    - repeat: number of timed runs
+    - warm_up: run it once untimed first, so one-off costs such as lazy imports aren't timed
+    """
+    timings: list = []
+    try:
+        if warm_up:
+            benchmark()
+        for _ in range(repeat):
+            start: float = time.perf_counter()
+            benchmark()
+            timings.append(time.perf_counter() - start)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    timings.sort()
+    return {"min": timings[0], "median": timings[len(timings) // 2], "repeat": repeat}
+
+
+def run_benchmarks(languages: list,
+                   repeat: int = DEFAULT_REPEAT,
+                   seed: int = BENCHMARK_SEED,
+                   prefilter_top_m: int = PREFILTER_TOP_M) -> dict:
+    results: dict = {"meta": {"seed": seed,
+                              "repeat": repeat,
+                              "python": platform.python_version(),
+                              "numpy": np.__version__,
+                              "machine": platform.machine()},
+                     "results": dict(),
+                     "prefilter": dict()}
+    for language in languages:
+        benchmarks: LanguageBenchmarks = LanguageBenchmarks(language, seed)
+        results["results"][language] = {name: time_benchmark(getattr(benchmarks, name), repeat,
+                                                             warm_up=name in WARM_UP_BENCHMARKS)
+                                        for name in BENCHMARK_NAMES}
+        if prefilter_top_m > 0:
+            results["prefilter"][language] = benchmarks.get_prefilter_tradeoff(prefilter_top_m)
+    return results
+
+
+def get_regressions(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """every benchmark whose best time is more than tolerance slower than the baseline's, or that now fails
+
+    Keyword arguments:
+    - results: output of run_benchmarks
+    - baseline: an earlier output of run_benchmarks
+    - tolerance: allowed relative slowdown, e.g. 0.25 for 25%
+    """
+    regressions: list = []
+    for language, timings in results["results"].items():
+        for name, timing in timings.items():
+            baseline_timing: dict = baseline.get("results", dict()).get(language, dict()).get(name, dict())
+            if "min" not in baseline_timing:
+                continue
+            if "min" not in timing:
+                regressions.append(f"{language} {name}: {timing['error']}")
+                continue
+            ratio: float = timing["min"] / baseline_timing["min"]
+            if ratio > 1 + tolerance:
+                regressions.append(f"{language} {name}: {timing['min']:.4f}s vs {baseline_timing['min']:.4f}s "
+                                   f"({ratio:.2f}x)")
+    return regressions
+
+
+def main() -> None:
+    parser: ArgumentParser = ArgumentParser(description="time the solver, filter and simulation hot paths "
+                                                        "on fixed answers")
+    parser.add_argument("--languages", nargs="+", default=["en", "fr"])
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=BENCHMARK_SEED)
+    parser.add_argument("--output", default=None, help="JSON file for the results")
+    parser.add_argument("--baseline", default=None, help="earlier JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative slowdown before a benchmark counts as a regression")
+    parser.add_argument("--prefilter-top-m", type=int, default=PREFILTER_TOP_M,
+                        help="compare full scoring with scoring only this many prefiltered guesses (0 to skip)")
+    args = parser.parse_args()
+
+    results: dict = run_benchmarks(args.languages, args.repeat, args.seed, args.prefilter_top_m)
+    for language, timings in results["results"].items():
+        for name, timing in timings.items():
+            outcome: str = f"{timing['min']:.4f}s" if "min" in timing else timing["error"]
+            print(f"{language} {name}: {outcome}")
+    for language, tradeoff in results["prefilter"].items():
+        print(f"{language} prefilter top {tradeoff['prefilter_top_m']}: {tradeoff['speedup']:.2f}x faster, "
+              f"{tradeoff['extra_guesses']:+.4f} average guesses")
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline, "r") as f:
+            regressions: list = get_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}")
+        if len(regressions) > 0:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from miscellaneous import load_language_words
+import numpy as np
+from patterns import get_colors_from_pattern, get_feedback
+import random
+from solve_client import DEFAULT_HOST, DEFAULT_PORT, SolveClient
+import time
+
+
+def get_random_states(answer_words: set, allowed_words: set, n_states: int, max_guesses: int, seed: int) -> list:
+    """seeded (guesses, colors) states of games against random answers, 0 to max_guesses rows each"""
+    rng: random.Random = random.Random(seed)
+    answers: list = sorted(answer_words)
+    guesses: list = sorted(allowed_words)
+    states: list = []
+    for _ in range(n_states):
+        answer: str = rng.choice(answers)
+        state_guesses: list = [rng.choice(guesses) for _ in range(rng.randint(0, max_guesses))]
+        state_colors: list = [get_colors_from_pattern(get_feedback(guess, answer), len(answer))
+                              for guess in state_guesses]
+        states.append((state_guesses, state_colors))
+    return states
+
+
+def run_client(host: str, port: int, states: list) -> tuple:
+    """send states one after another over a single keep-alive connection, timing each request"""
+    latencies: list = []
+    n_errors: int = 0
+    with SolveClient(host, port) as client:
+        for guesses, colors in states:
+            start: float = time.perf_counter()
+            result: dict = client.solve(guesses, colors)
+            latencies.append(time.perf_counter() - start)
+            n_errors += "error" in result
+    return latencies, n_errors
+
+
+def main() -> None:
+    parser: ArgumentParser = ArgumentParser(description="load test a running solve server on localhost")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--language", default="en", help="word list prefix in the data folder, e.g. en or fr")
+    parser.add_argument("--clients", type=int, default=8, help="number of concurrent keep-alive clients")
+    parser.add_argument("--requests", type=int, default=400, help="total number of requests")
+    parser.add_argument("--max-guesses", type=int, default=3, help="most rows in a random state")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    answer_words, allowed_words = load_language_words(args.language)
+    states: list = get_random_states(answer_words, allowed_words, args.requests, args.max_guesses, args.seed)
+    start: float = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        runs: list = list(pool.map(lambda client_states: run_client(args.host, args.port, client_states),
+                                   [states[i::args.clients] for i in range(args.clients)]))
+    elapsed: float = time.perf_counter() - start
+
+    latencies: np.ndarray = np.array([latency for run_latencies, _ in runs for latency in run_latencies]) * 1000
+    n_errors: int = sum(run_errors for _, run_errors in runs)
+    print(f"{len(latencies)} requests from {args.clients} clients in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.1f} requests/s), {n_errors} impossible states")
+    for percentile in (50, 90, 99):
+        print(f"p{percentile} latency: {np.percentile(latencies, percentile):.1f} ms")
+    with SolveClient(args.host, args.port) as client:
+        print(f"server: {client.health()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import json
+from time import perf_counter
+
+METRIC_PREFIX: str = "wordle"
+
+# the active collector, None while metrics are off so every hook is a single check
+_collector: "MetricsCollector" = None
+
+
+class _Timer:
+    """context manager adding one call's wall time to a collector"""
+    __slots__ = ("collector", "name", "start")
+
+    def __init__(self, collector: "MetricsCollector", name: str) -> None:
+        self.collector: MetricsCollector = collector
+        self.name: str = name
+        self.start: float = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.collector.add_time(self.name, perf_counter() - self.start)
+
+
+class _NullTimer:
+    """stands in for a timer while metrics are off"""
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_TIMER: _NullTimer = _NullTimer()
+
+
+class MetricsCollector:
+    """Wall time, call counts, set sizes and per move records of the solver's hot paths"""
+
+    def __init__(self) -> None:
+        # name -> [calls, total seconds, max seconds]
+        self.timings: dict = dict()
+        # name -> count
+        self.counters: dict = dict()
+        # name -> [observations, sum, min, max]
+        self.sizes: dict = dict()
+        # one dict per solver move: guess number, remaining words, how the guess was found and its time
+        self.moves: list = []
+
+    def add_time(self, name: str, seconds: float) -> None:
+        timing: list = self.timings.setdefault(name, [0, 0.0, 0.0])
+        timing[0] += 1
+        timing[1] += seconds
+        timing[2] = max(timing[2], seconds)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, size: int) -> None:
+        observed: list = self.sizes.setdefault(name, [0, 0, size, size])
+        observed[0] += 1
+        observed[1] += size
+        observed[2] = min(observed[2], size)
+        observed[3] = max(observed[3], size)
+
+    def record_move(self, guess_n: int, n_answers: int, n_allowed: int, source: str, seconds: float) -> None:
+        self.moves.append({"guess_n": guess_n,
+                           "n_answers": n_answers,
+                           "n_allowed": n_allowed,
+                           "source": source,
+                           "seconds": seconds})
+        self.count(f"guess_source_{source}")
+
+    def get_report(self) -> dict:
+        return {"timings": {name: {"calls": calls, "seconds": total, "max_seconds": longest}
+                            for name, (calls, total, longest) in sorted(self.timings.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "sizes": {name: {"observations": n, "sum": total, "min": smallest, "max": largest,
+                                 "mean": total / n}
+                          for name, (n, total, smallest, largest) in sorted(self.sizes.items())},
+                "moves": self.moves}
+
+    def get_prometheus_text(self) -> str:
+        """the aggregates in the Prometheus text exposition format (per move records are left out)"""
+        lines: list = []
+        # each family's samples follow its own TYPE line
+        for family, family_type, position in [("hot_path_seconds_total", "counter", 1),
+                                              ("hot_path_calls_total", "counter", 0),
+                                              ("hot_path_max_seconds", "gauge", 2)]:
+            lines.append(f"# TYPE {METRIC_PREFIX}_{family} {family_type}")
+            for name, timing in sorted(self.timings.items()):
+                lines.append(f'{METRIC_PREFIX}_{family}{{path="{name}"}} {timing[position]}')
+        lines.append(f"# TYPE {METRIC_PREFIX}_events_total counter")
+        for name, count in sorted(self.counters.items()):
+            lines.append(f'{METRIC_PREFIX}_events_total{{event="{name}"}} {count}')
+        lines.append(f"# TYPE {METRIC_PREFIX}_set_size summary")
+        for name, (n, total, _, _) in sorted(self.sizes.items()):
+            lines.append(f'{METRIC_PREFIX}_set_size_count{{set="{name}"}} {n}')
+            lines.append(f'{METRIC_PREFIX}_set_size_sum{{set="{name}"}} {total}')
+        # a summary only holds _count, _sum and quantiles, so the largest size is its own gauge
+        lines.append(f"# TYPE {METRIC_PREFIX}_set_size_max gauge")
+        for name, (_, _, _, largest) in sorted(self.sizes.items()):
+            lines.append(f'{METRIC_PREFIX}_set_size_max{{set="{name}"}} {largest}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path: str) -> None:
+        """save the report as Prometheus text for .prom/.txt files, JSON otherwise"""
+        with open(file_path, "w") as f:
+            if file_path.endswith((".prom", ".txt")):
+                f.write(self.get_prometheus_text())
+            else:
+                json.dump(self.get_report(), f, indent=2)
+
+
+def enable_metrics() -> MetricsCollector:
+    """start collecting into a fresh collector and return it"""
+    global _collector
+    _collector = MetricsCollector()
+    return _collector
+
+
+def disable_metrics() -> MetricsCollector:
+    """stop collecting and return what was collected, if anything"""
+    global _collector
+    collector: MetricsCollector = _collector
+    _collector = None
+    return collector
+
+
+def get_metrics() -> MetricsCollector:
+    """the active collector, or None while metrics are off"""
+    return _collector
+
+
+def timed(name: str):
+    """time a block under name, e.g. with timed("score_guesses"): ..."""
+    if _collector is None:
+        return _NULL_TIMER
+    return _Timer(_collector, name)
+
+
+def count(name: str, n: int = 1) -> None:
+    if _collector is not None:
+        _collector.count(name, n)
+
+
+def observe(name: str, size: int) -> None:
+    if _collector is not None:
+        _collector.observe(name, size)
@@ -1,6 +1,8 @@
 from os import getcwd, path
 from math import log2
-import pandas as pd
+import numpy as np
+from string import ascii_lowercase
+from word_dictionary import WordDictionary, load_word_dictionary
 
 SAME_LEN_REQ_OUTPUT: str = "guess must be the same length as answer"
 
@@ -9,10 +11,29 @@ def load_words_from_cwd_folder(folder_name: str, file_name: str) -> set:
     folder_dir: str = path.join(getcwd(), folder_name)
     words_file_fp: str = path.join(folder_dir, file_name)
     with open(words_file_fp, "r") as f:
-        word_set: set = {w for w in f.read().split("\n")}
+        # skip the blank entry left by the trailing newline
+        word_set: set = {w for w in f.read().split("\n") if w != ""}
     return word_set
 
 
+def load_language_words(language: str, word_length: int = 5, folder_name: str = "data") -> tuple:
+    """load a language's (answer words, allowed words), keeping only words of one length
+
+    Both are subsets of the allowed words' dictionary, read from its binary cache when the
+    text files haven't changed.
+
+    Keyword arguments:
+    - language: word list prefix in the folder, e.g. en or fr
+    - word_length: the game's word length
+    """
+    folder_dir: str = path.join(getcwd(), folder_name)
+    allowed_words: WordDictionary = load_word_dictionary(path.join(folder_dir, f"{language}_allowed_guesses.txt"),
+                                                         word_length)
+    answer_words: WordDictionary = load_word_dictionary(path.join(folder_dir, f"{language}_answer_words.txt"),
+                                                        word_length)
+    return allowed_words.get_subset(answer_words), allowed_words.all_words
+
+
 def is_invalid_string(string: str, valid_chars: str) -> bool:
     for char in string:
         if char not in valid_chars:
@@ -31,29 +52,83 @@ def validate_string_list(word_list: list, valid_length: int, valid_chars: str) -
     return True
 
 
-def get_letter_stats_df(words: list) -> pd.DataFrame:
-    lower_alphabet_count: dict = {letter: 0 for letter in ascii_lowercase}
-    df: pd.DataFrame = pd.DataFrame.from_dict(data=lower_alphabet_count.copy(),
-                                              orient="index",
-                                              columns=["total_count"])
-    WORD_LENGTH: int = max(len(w) for w in words)
-
-    for i in range(WORD_LENGTH):
-        df[f"idx_{i}_count"] = 0
-        df[f"idx_{i}_rel_freq"] = 0
-
-    for word in words:
-        for i, letter in enumerate(word):
-            row = df.loc[letter]
-            row["total_count"] += 1
-            row[f"idx_{i}_count"] += 1
-
-    df["total_rel_freq"] = df["total_count"]/sum(df["total_count"])
-    for letter in ascii_lowercase:
-        for i in range(WORD_LENGTH):
-            df[f"idx_{i}_rel_freq"] = df[f"idx_{i}_count"] / \
-                sum(df[f"idx_{i}_count"])
-
+def get_letter_position_counts(codes: np.ndarray, alphabet_size: int) -> np.ndarray:
+    """(alphabet_size, word_length) count of every letter code at every index, in one bincount
+
+    Keyword arguments:
+    - codes: (n_words, word_length) letter codes, e.g. WordDictionary.codes
+    - alphabet_size: number of letter codes
+    """
+    word_length: int = codes.shape[1]
+    cells: np.ndarray = codes.astype(np.intp) * word_length + np.arange(word_length)
+    return np.bincount(cells.ravel(), minlength=alphabet_size * word_length).reshape(alphabet_size, word_length)
+
+
+def get_coverage_scores(guess_codes: np.ndarray, answer_codes: np.ndarray, alphabet_size: int) -> np.ndarray:
+    """how evenly each guess's letters split the remaining answers, a cheap stand in for entropy
+
+    A distinct letter of the guess scores the answers holding it or the answers without it,
+    whichever is fewer, so letters every answer has score nothing. Each letter also scores the
+    answers holding it at the same index.
+
+    Keyword arguments:
+    - guess_codes: (n_guesses, word_length) letter codes of the guesses
+    - answer_codes: (n_answers, word_length) letter codes of the remaining answers
+    - alphabet_size: number of letter codes
+    """
+    n_answers, word_length = answer_codes.shape
+    position_counts: np.ndarray = get_letter_position_counts(answer_codes, alphabet_size)
+    # answers holding each letter at least once
+    is_repeat: np.ndarray = np.zeros(answer_codes.shape, dtype=bool)
+    for i in range(1, word_length):
+        is_repeat[:, i] = (answer_codes[:, :i] == answer_codes[:, i:i + 1]).any(axis=1)
+    word_counts: np.ndarray = np.bincount(answer_codes[~is_repeat], minlength=alphabet_size)
+    letter_scores: np.ndarray = np.minimum(word_counts, n_answers - word_counts)
+
+    scores: np.ndarray = position_counts[guess_codes, np.arange(word_length)].sum(axis=1)
+    for i in range(word_length):
+        is_first_copy: np.ndarray = ~(guess_codes[:, :i] == guess_codes[:, i:i + 1]).any(axis=1)
+        scores += letter_scores[guess_codes[:, i]] * is_first_copy
+    return scores
+
+
+def get_letter_stats_df(words) -> "pd.DataFrame":
+    """count and relative frequency of every letter, overall and at each index
+
+    Keyword arguments:
+    - words: words of one length, e.g. a WordSubset, whose letters needn't be ascii
+    """
+    # pandas is only needed here, so it isn't imported with the rest of the game
+    import pandas as pd
+    from word_dictionary import WordSubset
+
+    if isinstance(words, WordSubset):
+        alphabet: str = words.dictionary.alphabet
+        codes: np.ndarray = words.codes
+    else:
+        words: list = list(words)
+        word_length: int = len(words[0])
+        if any(len(w) != word_length for w in words):
+            raise ValueError("every word must have the same length")
+        code_points: np.ndarray = np.frombuffer("".join(words).encode("utf-32-le"), dtype=np.uint32)
+        alphabet_points, codes = np.unique(code_points, return_inverse=True)
+        alphabet: str = alphabet_points.astype(np.uint32).tobytes().decode("utf-32-le")
+        codes: np.ndarray = codes.reshape(len(words), word_length)
+    word_length: int = codes.shape[1]
+
+    alphabet_counts: np.ndarray = get_letter_position_counts(codes, len(alphabet))
+    # every ascii letter gets a row, even when no word uses it
+    letters: list = sorted(set(ascii_lowercase) |
+                           {letter for letter, n in zip(alphabet, alphabet_counts.sum(axis=1)) if n > 0})
+    counts: np.ndarray = np.zeros((len(letters), word_length), dtype=np.int64)
+    is_listed: np.ndarray = np.isin(list(alphabet), letters)
+    counts[np.searchsorted(letters, np.array(list(alphabet))[is_listed])] = alphabet_counts[is_listed]
+    df: pd.DataFrame = pd.DataFrame({"total_count": counts.sum(axis=1)}, index=letters)
+    relative_freqs: np.ndarray = counts / counts.sum(axis=0)
+    for i in range(word_length):
+        df[f"idx_{i}_count"] = counts[:, i]
+        df[f"idx_{i}_rel_freq"] = relative_freqs[:, i]
+    df["total_rel_freq"] = df["total_count"] / df["total_count"].sum()
     return df
 
 
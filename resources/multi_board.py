@@ -0,0 +1,165 @@
+from metrics import observe, timed
+import numpy as np
+from patterns import PatternMatrix, get_batch_pattern_entropies, get_colors_from_pattern, get_pattern_entropies, \
+    get_pattern_matrix, get_top_guess_position
+import random
+from strategy import StrategyTree, load_opening_book
+from word_dictionary import WordDictionary, WordSubset, get_word_dictionary
+from wordle import Wordle
+from wordle_exceptions import *
+
+
+class MultiBoardSolver:
+    """Pick one guess for several boards at once, e.g. Dordle or Quordle
+
+    Every allowed guess is scored against all unsolved boards in one batched pass, and its
+    score is the sum of its single step entropies over those boards.
+    """
+
+    def __init__(self, pattern_matrix: PatternMatrix) -> None:
+        self.pattern_matrix: PatternMatrix = pattern_matrix
+        self.guess_ids: np.ndarray = np.arange(len(pattern_matrix.allowed_words))
+        # summed entropy of every guess in guess_ids at the last scored position
+        self.guess_scores: np.ndarray = np.empty(0, dtype=np.float64)
+        self.__first_guess: str = None
+
+    def get_first_guess(self) -> str:
+        """every board starts with every answer, so the best single board first guess is best for all of them"""
+        if self.__first_guess is None:
+            opening_book: StrategyTree = load_opening_book(self.pattern_matrix)
+            if opening_book is not None:
+                self.__first_guess: str = opening_book.first_guess
+            else:
+                scores: np.ndarray = get_pattern_entropies(self.pattern_matrix.matrix,
+                                                           np.arange(len(self.pattern_matrix.answer_words)),
+                                                           self.guess_ids,
+                                                           self.pattern_matrix.n_patterns)
+                self.__first_guess: str = self.pattern_matrix.allowed_words[
+                    get_top_guess_position(scores, self.guess_ids, self.pattern_matrix.answer_rows)]
+        return self.__first_guess
+
+    def get_optimal_guess(self, board_answer_ids: list) -> str:
+        """the next guess for the unsolved boards
+
+        A board down to one candidate is solved straight away. Otherwise the guess with the
+        highest summed entropy is played, preferring a candidate answer of any board among
+        equal scores.
+
+        Keyword arguments:
+        - board_answer_ids: pattern matrix columns of the candidate answers of every unsolved board
+        """
+        n_answers: int = len(self.pattern_matrix.answer_words)
+        if all(len(answer_ids) == n_answers for answer_ids in board_answer_ids):
+            return self.get_first_guess()
+        for answer_ids in board_answer_ids:
+            if len(answer_ids) == 1:
+                return self.pattern_matrix.answer_words[int(answer_ids[0])]
+
+        observe("multi_board_scored_boards", len(board_answer_ids))
+        with timed("multi_board_score_guesses"):
+            self.guess_scores: np.ndarray = get_batch_pattern_entropies(self.pattern_matrix.matrix,
+                                                                        board_answer_ids,
+                                                                        self.guess_ids,
+                                                                        self.pattern_matrix.n_patterns).sum(axis=0)
+        candidate_guess_ids: np.ndarray = np.unique(np.concatenate(
+            [self.pattern_matrix.answer_rows[answer_ids] for answer_ids in board_answer_ids]))
+        top_position: int = get_top_guess_position(self.guess_scores, self.guess_ids, candidate_guess_ids)
+        return self.pattern_matrix.allowed_words[int(self.guess_ids[top_position])]
+
+
+class MultiBoardWordle:
+    """Several Wordle boards played with the same guesses, 2 for Dordle and 4 for Quordle
+
+    Each board keeps its own candidate answers, as pattern matrix columns, and drops out once
+    it's solved. The game allows MAX_GUESS_N + n_boards - 1 guesses.
+    """
+
+    def __init__(self,
+                 answer_words: set,
+                 allowed_words: set,
+                 n_boards: int = 2,
+                 show_output: bool = True) -> None:
+        if n_boards < 1:
+            raise ValueError("a game needs at least one board")
+        self.answer_words: set = answer_words
+        self.allowed_words: set = allowed_words
+        if len(allowed_words) == 0 or len(answer_words) == 0:
+            raise InvalidSet(self, "empty set(s)")
+        elif not answer_words.issubset(allowed_words):
+            raise InvalidSet(self, "subset not in superset")
+        self.n_boards: int = n_boards
+        self.show_output: bool = show_output
+        self.max_guess_n: int = Wordle.MAX_GUESS_N + n_boards - 1
+        self.dictionary: WordDictionary = get_word_dictionary(allowed_words)
+        self.original_allowed_words: WordSubset = self.dictionary.all_words
+        self.original_answer_words: WordSubset = self.dictionary.get_subset(answer_words)
+        if len(self.original_answer_words) < n_boards:
+            raise ValueError(f"{n_boards} boards need at least {n_boards} answer words")
+        self.pattern_matrix: PatternMatrix = get_pattern_matrix(self.dictionary, self.original_answer_words)
+        self.solver: MultiBoardSolver = MultiBoardSolver(self.pattern_matrix)
+
+        self.answers: list = []
+        # candidate answer columns of every board
+        self.board_answer_ids: list = []
+        # guess number that solved each board, 0 while it's unsolved
+        self.solved_guess_ns: list = []
+        self.used_guesses: list = []
+        self.game_over: bool = False
+        self.reset()
+
+    def reset(self) -> None:
+        """start a new game against n_boards different random answers"""
+        self.set_answers(random.sample(list(self.original_answer_words), self.n_boards))
+
+    def set_answers(self, answers: list) -> None:
+        """start a new game against chosen answers, one per board"""
+        if len(answers) != self.n_boards:
+            raise ValueError(f"a game needs exactly {self.n_boards} answers")
+        if any(answer not in self.original_answer_words for answer in answers):
+            raise InvalidSet(self, "answer not in answer words")
+        all_answer_ids: np.ndarray = np.arange(len(self.pattern_matrix.answer_words))
+        self.answers: list = list(answers)
+        self.board_answer_ids: list = [all_answer_ids] * self.n_boards
+        self.solved_guess_ns: list = [0] * self.n_boards
+        self.used_guesses.clear()
+        self.game_over: bool = False
+
+    @property
+    def is_solved(self) -> bool:
+        return all(guess_n > 0 for guess_n in self.solved_guess_ns)
+
+    def play(self) -> None:
+        """let the solver play the current answers to the end"""
+        while not self.game_over:
+            self.play_next_guess()
+        if self.show_output:
+            print(Wordle.OUTRO_WIN_OUTPUT if self.is_solved else
+                  Wordle.OUTRO_LOSS_OUTPUT + ", ".join(self.answers), flush=True)
+
+    def play_answers(self, answers: list) -> None:
+        """play a whole game against chosen answers, leaving the final state in place until the next reset"""
+        self.set_answers(answers)
+        self.play()
+
+    def play_next_guess(self) -> None:
+        """play the solver's next guess on every unsolved board"""
+        if self.game_over:
+            return
+        unsolved_boards: list = [board for board in range(self.n_boards) if self.solved_guess_ns[board] == 0]
+        guess: str = self.solver.get_optimal_guess([self.board_answer_ids[board] for board in unsolved_boards])
+        self.used_guesses.append(guess)
+        guess_id: int = self.dictionary.get_id(guess)
+
+        board_colors: list = []
+        for board in unsolved_boards:
+            pattern: int = self.pattern_matrix.get_pattern(guess, self.answers[board])
+            answer_ids: np.ndarray = self.board_answer_ids[board]
+            self.board_answer_ids[board] = answer_ids[self.pattern_matrix.matrix[
+                guess_id, answer_ids] == pattern]
+            if pattern == 0:
+                self.solved_guess_ns[board] = len(self.used_guesses)
+            if self.show_output:
+                board_colors.append(get_colors_from_pattern(pattern, self.pattern_matrix.word_length))
+        if self.show_output:
+            print(f"{len(self.used_guesses)}: {guess} {' '.join(board_colors)}", flush=True)
+        self.game_over: bool = self.is_solved or len(self.used_guesses) == self.max_guess_n
@@ -0,0 +1,176 @@
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import json
+from os import fsync, replace
+from patterns import get_pattern_entropies
+import wordle_sim_stats
+from wordle_sim_stats import *
+
+SWEEP_FILE_PREFIX: str = "opener_sweep_"
+DEFAULT_TOP_N: int = 20
+
+
+def _sweep_worker_opener(opener: str) -> dict:
+    """simulate every answer after one opener inside a worker, with the game built by the pool initializer"""
+    return simulate_opener(wordle_sim_stats._worker_game, opener)
+
+
+def simulate_opener(game: Wordle, opener: str) -> dict:
+    """the full simulated results of one first guess, as one checkpoint record
+
+    Keyword arguments:
+    - game: a silent automated game, reused for every opener
+    - opener: the first guess of every simulated game
+    """
+    game.first_guess = opener
+    game.excluded_answers = set()
+    game.reset()
+    stats: SimulateGameStats = SimulateGameStats(game)
+    stats.simulate_all_games_by_partition()
+    return {"opener": opener,
+            "avg_n_guesses": stats.avg_n_guesses,
+            "wins": stats.wins,
+            "losses": stats.losses,
+            "guess_counts": stats.guess_counts}
+
+
+def get_sweep_file_path(pattern_matrix: PatternMatrix, language: str) -> str:
+    """checkpoints are named after the word lists' fingerprint, so a changed list starts over"""
+    return path.join(getcwd(), f"{SWEEP_FILE_PREFIX}{language}_{pattern_matrix.key}.jsonl")
+
+
+def read_checkpoint(file_path: str) -> dict:
+    """opener -> record of every opener finished so far, skipping a line cut short by a crash"""
+    records: dict = dict()
+    if not path.isfile(file_path):
+        return records
+    with open(file_path, "r") as f:
+        for line in f:
+            try:
+                record: dict = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            record["guess_counts"] = {int(n_guesses): n for n_guesses, n in record["guess_counts"].items()}
+            records[record["opener"]] = record
+    return records
+
+
+def _write_checkpoint(file_path: str, records: dict) -> None:
+    """rewrite the checkpoint with only whole records, so appends never follow a partial line"""
+    tmp_file_path: str = file_path + ".tmp"
+    with open(tmp_file_path, "w") as f:
+        for record in records.values():
+            f.write(json.dumps(record) + "\n")
+    replace(tmp_file_path, file_path)
+
+
+def get_openers_by_entropy(pattern_matrix: PatternMatrix) -> list:
+    """every allowed guess, highest single step entropy against all answers first"""
+    scores: np.ndarray = get_pattern_entropies(pattern_matrix.matrix, np.arange(len(pattern_matrix.answer_words)),
+                                               n_patterns=pattern_matrix.n_patterns)
+    return [pattern_matrix.allowed_words[guess_id] for guess_id in np.argsort(-scores, kind="stable")]
+
+
+def get_leaderboard(records: dict) -> list:
+    """finished records, fewest average guesses first, then fewest losses"""
+    return sorted(records.values(), key=lambda record: (record["avg_n_guesses"], record["losses"], record["opener"]))
+
+
+def sweep_openers(game: Wordle,
+                  openers: list,
+                  checkpoint_file_path: str,
+                  n_workers: int = 1,
+                  show_progress: bool = True) -> list:
+    """simulate every answer after each opener and return the leaderboard of all finished openers
+
+    Each opener's whole dictionary is played by simulate_all_games_by_partition, and its record
+    is appended to a JSON lines checkpoint as soon as it's done. Openers already in the
+    checkpoint are skipped, so an interrupted sweep resumes where it stopped.
+
+    Keyword arguments:
+    - game: silent automated game of the dictionary, played directly when there's one worker
+    - openers: first guesses to rank, in the order they're started
+    - checkpoint_file_path: JSON lines file of finished records
+    - n_workers: number of processes to spread the openers over
+    - show_progress: draw a progress bar
+    """
+    from tqdm import tqdm
+
+    records: dict = read_checkpoint(checkpoint_file_path)
+    _write_checkpoint(checkpoint_file_path, records)
+    pending: list = [opener for opener in dict.fromkeys(openers) if opener not in records]
+    with open(checkpoint_file_path, "a") as f, tqdm(total=len(pending), disable=not show_progress) as progress:
+        def record_opener(record: dict) -> None:
+            records[record["opener"]] = record
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            fsync(f.fileno())
+            progress.update()
+
+        if n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers,
+                                     initializer=wordle_sim_stats._setup_worker_game,
+                                     initargs=(game.original_answer_words,
+                                               game.original_allowed_words,
+                                               False,
+                                               game.lookahead_top_k,
+                                               game.lookahead_seconds,
+                                               None,
+                                               game.prefilter_top_m,
+                                               game.use_opening_book,
+                                               game.sample_size,
+                                               game.sample_seed,
+                                               game.save_solver_results)) as pool:
+                for future in as_completed([pool.submit(_sweep_worker_opener, opener) for opener in pending]):
+                    record_opener(future.result())
+        else:
+            for opener in pending:
+                record_opener(simulate_opener(game, opener))
+    return get_leaderboard(records)
+
+
+def main() -> None:
+    parser: ArgumentParser = ArgumentParser(description="rank first guesses by the solver's simulated average "
+                                                        "guesses over every answer, resuming from a checkpoint")
+    parser.add_argument("--language", default="en", help="word list prefix in the data folder, e.g. en or fr")
+    parser.add_argument("--word-length", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1, help="number of processes to spread the openers over")
+    parser.add_argument("--openers", nargs="+", default=None,
+                        help="first guesses to rank instead of every allowed guess")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="only rank this many openers, highest single step entropy first")
+    parser.add_argument("--checkpoint", default=None, help="JSON lines file of finished openers")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_N, help="number of leaderboard rows to print")
+    parser.add_argument("--output", default=None, help="JSON file for the whole leaderboard")
+    args = parser.parse_args()
+
+    answer_words, allowed_words = load_language_words(args.language, args.word_length)
+    game: Wordle = Wordle(answer_words=answer_words,
+                          allowed_words=allowed_words,
+                          show_output=False,
+                          is_automated=True,
+                          use_hints=False,
+                          save_solver_results=False)
+    if args.openers is not None:
+        unknown_openers: list = [opener for opener in args.openers if opener not in game.original_allowed_words]
+        if len(unknown_openers) > 0:
+            raise SystemExit(f"not allowed {args.language} guesses: {', '.join(unknown_openers)}")
+        openers: list = args.openers
+    else:
+        openers: list = get_openers_by_entropy(game.pattern_matrix)
+    if args.limit is not None:
+        openers: list = openers[:args.limit]
+    checkpoint_file_path: str = args.checkpoint if args.checkpoint is not None else \
+        get_sweep_file_path(game.pattern_matrix, args.language)
+
+    leaderboard: list = sweep_openers(game, openers, checkpoint_file_path, args.workers)
+    for rank, record in enumerate(leaderboard[:args.top], start=1):
+        distribution: str = " ".join(f"{n_guesses}:{n}" for n_guesses, n in record["guess_counts"].items() if n > 0)
+        print(f"{rank}. {record['opener']} {record['avg_n_guesses']:.4f} losses={record['losses']} {distribution}")
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(leaderboard, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from patterns import PatternMatrix, get_pattern_entropies
+
+# pattern matrix view of the worker process, attached once by the pool initializer
+_worker_shared_memory: SharedMemory = None
+_worker_matrix: np.ndarray = None
+_worker_n_patterns: int = 0
+
+_scorers: dict = dict()
+
+
+def _attach_shared_matrix(shared_memory_name: str, shape: tuple, dtype: str, n_patterns: int) -> None:
+    """pool initializer: map the parent's pattern matrix instead of receiving a pickled copy"""
+    global _worker_shared_memory, _worker_matrix, _worker_n_patterns
+    _worker_shared_memory = SharedMemory(name=shared_memory_name)
+    _worker_matrix = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_worker_shared_memory.buf)
+    _worker_n_patterns = n_patterns
+
+
+def _load_matrix_file(file_path: str, n_patterns: int) -> None:
+    """pool initializer: memory-map the cached pattern matrix, sharing the parent's page cache"""
+    global _worker_matrix, _worker_n_patterns
+    _worker_matrix = np.load(file_path, mmap_mode="r")
+    _worker_n_patterns = n_patterns
+
+
+def _score_chunk(answer_ids: np.ndarray, guess_ids: np.ndarray) -> np.ndarray:
+    """entropy of one chunk of guesses, computed inside a worker"""
+    return get_pattern_entropies(_worker_matrix, answer_ids, guess_ids, _worker_n_patterns)
+
+
+class ParallelScorer:
+    """Split guess scoring across a process pool that shares a single copy of the pattern matrix
+
+    Workers memory-map the matrix's .npy cache when it has one, and otherwise attach to a
+    shared memory copy of a matrix that was built in memory.
+    """
+
+    def __init__(self, pattern_matrix: PatternMatrix, n_workers: int) -> None:
+        assert n_workers > 1
+        matrix: np.ndarray = pattern_matrix.matrix
+        self.n_workers: int = n_workers
+        self.shared_memory: SharedMemory = None
+        if isinstance(matrix, np.memmap) and pattern_matrix.cache_file_path is not None:
+            initializer = _load_matrix_file
+            initargs: tuple = (pattern_matrix.cache_file_path, pattern_matrix.n_patterns)
+        else:
+            self.shared_memory: SharedMemory = SharedMemory(create=True, size=max(1, matrix.nbytes))
+            shared_matrix: np.ndarray = np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=self.shared_memory.buf)
+            shared_matrix[:] = matrix
+            initializer = _attach_shared_matrix
+            initargs: tuple = (self.shared_memory.name, matrix.shape, matrix.dtype.str, pattern_matrix.n_patterns)
+        self.pool: ProcessPoolExecutor = ProcessPoolExecutor(max_workers=n_workers,
+                                                             initializer=initializer,
+                                                             initargs=initargs)
+
+    def score(self, answer_ids: np.ndarray, guess_ids: np.ndarray) -> np.ndarray:
+        """score guess_ids in contiguous chunks, one per worker, and stitch the scores back in order
+
+        Keyword arguments:
+        - answer_ids: pattern matrix columns of the remaining answer words
+        - guess_ids: pattern matrix rows of the guesses to score
+        """
+        chunks: list = [chunk for chunk in np.array_split(guess_ids, self.n_workers) if len(chunk) > 0]
+        futures: list = [self.pool.submit(_score_chunk, answer_ids, chunk) for chunk in chunks]
+        if len(futures) == 0:
+            return np.empty(0, dtype=np.float64)
+        return np.concatenate([future.result() for future in futures])
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+            self.shared_memory.unlink()
+
+
+def get_parallel_scorer(pattern_matrix: PatternMatrix, n_workers: int) -> ParallelScorer:
+    """reuse one pool per (word lists, worker count) for the lifetime of the process"""
+    key: tuple = (pattern_matrix.key, n_workers)
+    if key not in _scorers:
+        _scorers[key] = ParallelScorer(pattern_matrix, n_workers)
+    return _scorers[key]
+
+
+@atexit.register
+def close_parallel_scorers() -> None:
+    """shut down every pool and release any shared memory"""
+    while len(_scorers) > 0:
+        _, scorer = _scorers.popitem()
+        scorer.close()
@@ -0,0 +1,601 @@
+from hashlib import sha1
+import numpy as np
+from os import getcwd, makedirs, path, remove, replace
+from word_dictionary import WordDictionary, WordSubset, get_word_dictionary
+
+# each letter of a guess is labelled with one of three colors, and the labels of a
+# whole guess form a base-3 code (first letter most significant). The color values
+# follow the order of the original itertools.product enumeration, so a code is the
+# index of that pattern in product([green, yellow, grey], repeat=word_length)
+GREEN: int = 0
+YELLOW: int = 1
+GREY: int = 2
+N_COLORS: int = 3
+# bump whenever the meaning of a pattern code changes so stale caches get rebuilt
+PATTERN_VERSION: int = 2
+CACHE_FOLDER_NAME: str = "data"
+CACHE_FILE_PREFIX: str = "pattern_matrix_"
+# an interrupted build leaves its rows in a memory-mapped partial file and a count of the
+# rows finished next to it, so the next build picks up where it stopped
+PARTIAL_FILE_SUFFIX: str = ".partial.npy"
+PROGRESS_FILE_SUFFIX: str = ".partial.rows"
+# default ceiling on the working memory of one block of the build, the matrix itself lives on disk
+BUILD_MEMORY_BYTES: int = 64 << 20
+# upper bound on the (guess, answer) cells gathered at once while scoring
+SCORE_CHUNK_CELLS: int = 1 << 22
+
+_loaded_matrices: dict = dict()
+
+
+def get_n_patterns(word_length: int) -> int:
+    """number of distinct feedback patterns for a word length"""
+    return N_COLORS ** word_length
+
+
+def get_pattern_dtype(word_length: int) -> np.dtype:
+    """smallest unsigned integer type that can hold every pattern code"""
+    return np.dtype(np.uint8) if get_n_patterns(word_length) <= 256 else np.dtype(np.uint16)
+
+
+def get_word_lists_key(allowed_words: list, answer_words: list) -> str:
+    """fingerprint both word lists so a cached matrix is only reused for the same words"""
+    digest = sha1(f"v{PATTERN_VERSION}\n".encode("utf-8"))
+    digest.update("\n".join(sorted(allowed_words)).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update("\n".join(sorted(answer_words)).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def encode_words(words: list) -> np.ndarray:
+    """encode equal length words as a (n_words, word_length) array of code points
+
+    Dictionary words are already encoded as letter codes, which compare the same way.
+    """
+    if isinstance(words, (WordDictionary, WordSubset)):
+        return words.codes
+    if len(words) == 0:
+        return np.empty((0, 0), dtype=np.uint32)
+    word_length: int = len(words[0])
+    encoded: np.ndarray = np.frombuffer("".join(words).encode("utf-32-le"), dtype=np.uint32)
+    return encoded.reshape(len(words), word_length)
+
+
+def get_feedback(guess: str, answer: str) -> int:
+    """the exact Wordle coloring of a guess as a pattern code, with duplicate letters handled in two passes
+
+    The first pass marks the greens and counts the answer's letters that no green used up.
+    The second pass goes left to right and makes a letter yellow while unused copies of it
+    are left, so a guess never gets more yellows and greens for a letter than the answer has.
+    """
+    colors: list = [GREY] * len(guess)
+    unmatched_letters: dict = dict()
+    for i, (letter, answer_letter) in enumerate(zip(guess, answer)):
+        if letter == answer_letter:
+            colors[i] = GREEN
+        else:
+            unmatched_letters[answer_letter] = unmatched_letters.get(answer_letter, 0) + 1
+    code: int = 0
+    for i, letter in enumerate(guess):
+        if colors[i] == GREY and unmatched_letters.get(letter, 0) > 0:
+            colors[i] = YELLOW
+            unmatched_letters[letter] -= 1
+        code = code * N_COLORS + colors[i]
+    return code
+
+
+def get_batch_feedback(guess: str, answer_words: list) -> np.ndarray:
+    """get_feedback of one guess against many answers, as an array in the answers' order"""
+    answer_words: list = list(answer_words)
+    if len(answer_words) == 0:
+        return np.empty(0, dtype=np.int32)
+    return _get_feedback_codes(encode_words([guess]), encode_words(answer_words))[0]
+
+
+def _get_feedback_codes(guesses: np.ndarray, answers: np.ndarray) -> np.ndarray:
+    """get_feedback of every encoded (guess, answer) pair as a (n_guesses, n_answers) array
+
+    A guess letter that isn't green is yellow when the answer has more copies of it outside
+    its greens than the guess has non-green copies of it before that position.
+    """
+    word_length: int = guesses.shape[1]
+    is_green: np.ndarray = guesses[:, None, :] == answers[None, :, :]
+    codes: np.ndarray = np.zeros((len(guesses), len(answers)), dtype=np.int32)
+    for i in range(word_length):
+        letters: np.ndarray = guesses[:, i, None, None]
+        n_unmatched: np.ndarray = ((answers[None, :, :] == letters) & ~is_green).sum(axis=2)
+        n_earlier: np.ndarray = ((guesses[:, None, :i] == letters) & ~is_green[:, :, :i]).sum(axis=2)
+        colors: np.ndarray = np.where(is_green[:, :, i], GREEN, np.where(n_unmatched > n_earlier, YELLOW, GREY))
+        codes = codes * N_COLORS + colors
+    return codes
+
+
+def decode_pattern(pattern: int, word_length: int) -> list:
+    """split a pattern code back into one color per letter"""
+    colors: list = []
+    for _ in range(word_length):
+        pattern, color = divmod(pattern, N_COLORS)
+        colors.append(color)
+    return colors[::-1]
+
+
+def get_pattern_from_colors(colors: str) -> int:
+    """encode guide mode color symbols (g = green, y = yellow, _ = grey, / = grey at index only)
+
+    A letter that is grey at its index but elsewhere in the answer is a surplus duplicate,
+    which exact Wordle coloring labels grey.
+    """
+    symbol_colors: dict = {"g": GREEN, "y": YELLOW, "/": GREY, "_": GREY}
+    code: int = 0
+    for symbol in colors:
+        code = code * N_COLORS + symbol_colors[symbol]
+    return code
+
+
+def get_colors_from_pattern(pattern: int, word_length: int) -> str:
+    """guide mode color symbols of a pattern code, the inverse of get_pattern_from_colors"""
+    color_symbols: dict = {GREEN: "g", YELLOW: "y", GREY: "_"}
+    return "".join(color_symbols[color] for color in decode_pattern(pattern, word_length))
+
+
+def get_absent_letters(guess: str, pattern: int) -> set:
+    """letters of the guess that were only ever labelled grey, i.e. not in the answer"""
+    colors: list = decode_pattern(pattern, len(guess))
+    grey_letters: set = {letter for letter, color in zip(guess, colors) if color == GREY}
+    found_letters: set = {letter for letter, color in zip(guess, colors) if color != GREY}
+    return grey_letters - found_letters
+
+
+def get_top_guess_position(scores: np.ndarray,
+                           guess_ids: np.ndarray,
+                           candidate_guess_ids: np.ndarray) -> int:
+    """position of the highest score, preferring a remaining candidate answer among equal scores
+
+    Keyword arguments:
+    - scores: score of each guess in guess_ids
+    - guess_ids: pattern matrix rows that were scored, in ascending order
+    - candidate_guess_ids: pattern matrix rows of the remaining candidate answers
+    """
+    top_position: int = int(np.argmax(scores))
+    tied_positions: np.ndarray = np.flatnonzero(scores == scores[top_position])
+    if len(tied_positions) > 1:
+        is_candidate: np.ndarray = np.isin(guess_ids[tied_positions], candidate_guess_ids)
+        if is_candidate.any():
+            return int(tied_positions[np.argmax(is_candidate)])
+    return top_position
+
+
+def get_build_block_size(n_answers: int, word_length: int, max_build_bytes: int = BUILD_MEMORY_BYTES) -> int:
+    """guesses per build block so the block's temporary arrays stay under max_build_bytes
+
+    Computing a block's feedback codes peaks at roughly 5 * word_length + 28 bytes per
+    (guess, answer) cell, which 6 * word_length + 32 rounds up.
+    """
+    bytes_per_guess: int = max(1, n_answers) * (6 * word_length + 32)
+    return max(1, max_build_bytes // bytes_per_guess)
+
+
+def get_pattern_blocks(allowed_words: list,
+                       answer_words: list,
+                       first_row: int = 0,
+                       max_build_bytes: int = BUILD_MEMORY_BYTES):
+    """yield (first row, pattern codes) of consecutive blocks of guesses, starting at first_row
+
+    Keyword arguments:
+    - allowed_words: ordered list of guesses, one matrix row each
+    - answer_words: ordered list of answers, one matrix column each
+    - first_row: row to start from, e.g. the rows already done by an interrupted build
+    - max_build_bytes: memory ceiling of a single block
+    """
+    guesses: np.ndarray = encode_words(allowed_words)
+    answers: np.ndarray = encode_words(answer_words)
+    block_size: int = get_build_block_size(len(answers), guesses.shape[1], max_build_bytes)
+    for start in range(first_row, len(guesses), block_size):
+        yield start, _get_feedback_codes(guesses[start:start + block_size], answers)
+
+
+def build_pattern_matrix(allowed_words: list,
+                         answer_words: list,
+                         max_build_bytes: int = BUILD_MEMORY_BYTES) -> np.ndarray:
+    """compute the get_feedback code of every (guess, answer) pair in memory, one block of guesses at a time
+
+    Keyword arguments:
+    - allowed_words: ordered list of guesses, one matrix row each
+    - answer_words: ordered list of answers, one matrix column each
+    - max_build_bytes: memory ceiling of a single block, on top of the matrix
+    """
+    matrix: np.ndarray = np.empty((len(allowed_words), len(answer_words)),
+                                  dtype=get_pattern_dtype(len(allowed_words[0])))
+    for start, codes in get_pattern_blocks(allowed_words, answer_words, max_build_bytes=max_build_bytes):
+        matrix[start:start + len(codes)] = codes
+    return matrix
+
+
+def count_patterns(matrix: np.ndarray,
+                   answer_ids: np.ndarray,
+                   guess_ids: np.ndarray,
+                   n_patterns: int) -> np.ndarray:
+    """n_patterns bin histogram of every guess's pattern codes over the answers
+
+    Keyword arguments:
+    - matrix: pattern matrix with one row per allowed guess
+    - answer_ids: columns of the answer words to count
+    - guess_ids: rows of the guesses to count for
+    - n_patterns: number of histogram bins
+    """
+    histograms: np.ndarray = np.zeros((len(guess_ids), n_patterns), dtype=np.int32)
+    if len(answer_ids) == 0:
+        return histograms
+    answer_ids: np.ndarray = np.asarray(answer_ids)
+    chunk_size: int = max(1, SCORE_CHUNK_CELLS // len(answer_ids))
+
+    for start in range(0, len(guess_ids), chunk_size):
+        chunk_guess_ids: np.ndarray = guess_ids[start:start + chunk_size]
+        codes: np.ndarray = matrix[chunk_guess_ids][:, answer_ids].astype(np.intp)
+        codes += (np.arange(len(chunk_guess_ids)) * n_patterns)[:, None]
+        histograms[start:start + len(chunk_guess_ids)] = np.bincount(
+            codes.ravel(), minlength=len(chunk_guess_ids) * n_patterns).reshape(len(chunk_guess_ids), n_patterns)
+
+    return histograms
+
+
+def get_histogram_entropies(histograms: np.ndarray, n_answers: int) -> np.ndarray:
+    """entropy (in bits) of each histogram row: E[info] = log2(n) - sum(count * log2(count)) / n"""
+    if n_answers <= 1:
+        return np.zeros(len(histograms), dtype=np.float64)
+    counts_range: np.ndarray = np.arange(n_answers + 1, dtype=np.float64)
+    count_log_counts: np.ndarray = counts_range * np.log2(np.maximum(counts_range, 1))
+    return np.log2(n_answers) - count_log_counts[histograms].sum(axis=1) / n_answers
+
+
+def get_pattern_entropies(matrix: np.ndarray,
+                          answer_ids: np.ndarray,
+                          guess_ids: np.ndarray = None,
+                          n_patterns: int = None) -> np.ndarray:
+    """single step entropy (in bits) of many guesses against the same remaining answers
+
+    Every guess gets an n_patterns bin histogram of its pattern codes over the answers,
+    built for a whole chunk of guesses with one bincount, so only one chunk of
+    histograms is held in memory at a time.
+
+    Keyword arguments:
+    - matrix: pattern matrix with one row per allowed guess
+    - answer_ids: columns of the remaining answer words
+    - guess_ids: rows of the guesses to score, all rows if omitted
+    - n_patterns: number of histogram bins, derived from the matrix dtype if omitted
+    """
+    if guess_ids is None:
+        guess_ids: np.ndarray = np.arange(matrix.shape[0])
+    if n_patterns is None:
+        n_patterns: int = np.iinfo(matrix.dtype).max + 1
+    n_answers: int = len(answer_ids)
+    scores: np.ndarray = np.zeros(len(guess_ids), dtype=np.float64)
+    if n_answers <= 1 or len(guess_ids) == 0:
+        return scores
+
+    chunk_size: int = max(1, SCORE_CHUNK_CELLS // n_answers)
+    for start in range(0, len(guess_ids), chunk_size):
+        chunk_guess_ids: np.ndarray = guess_ids[start:start + chunk_size]
+        histograms: np.ndarray = count_patterns(matrix, answer_ids, chunk_guess_ids, n_patterns)
+        scores[start:start + len(chunk_guess_ids)] = get_histogram_entropies(histograms, n_answers)
+
+    return scores
+
+
+def get_batch_pattern_entropies(matrix: np.ndarray,
+                                answer_id_sets: list,
+                                guess_ids: np.ndarray,
+                                n_patterns: int) -> np.ndarray:
+    """single step entropy of the same guesses against several independent sets of remaining answers
+
+    The answer sets are laid side by side and every set gets its own block of n_patterns
+    histogram bins, so a chunk of guesses is counted for all of the sets with one bincount.
+
+    Keyword arguments:
+    - matrix: pattern matrix with one row per allowed guess
+    - answer_id_sets: columns of the remaining answer words, one array per set
+    - guess_ids: rows of the guesses to score
+    - n_patterns: number of histogram bins per set
+
+    Returns an (n_sets, n_guesses) array of scores
+    """
+    n_sets: int = len(answer_id_sets)
+    scores: np.ndarray = np.zeros((n_sets, len(guess_ids)), dtype=np.float64)
+    n_answers: np.ndarray = np.array([len(answer_ids) for answer_ids in answer_id_sets], dtype=np.intp)
+    if n_sets == 0 or len(guess_ids) == 0 or n_answers.sum() == 0:
+        return scores
+    all_answer_ids: np.ndarray = np.concatenate([np.asarray(answer_ids, dtype=np.intp) for answer_ids in answer_id_sets])
+    set_offsets: np.ndarray = np.repeat(np.arange(n_sets, dtype=np.intp) * n_patterns, n_answers)
+    n_bins: int = n_sets * n_patterns
+
+    chunk_size: int = max(1, SCORE_CHUNK_CELLS // len(all_answer_ids))
+    for start in range(0, len(guess_ids), chunk_size):
+        chunk_guess_ids: np.ndarray = guess_ids[start:start + chunk_size]
+        codes: np.ndarray = matrix[chunk_guess_ids][:, all_answer_ids].astype(np.intp)
+        codes += set_offsets[None, :] + (np.arange(len(chunk_guess_ids)) * n_bins)[:, None]
+        histograms: np.ndarray = np.bincount(codes.ravel(), minlength=len(chunk_guess_ids) * n_bins).reshape(
+            len(chunk_guess_ids), n_sets, n_patterns).astype(np.int32)
+        for set_i in range(n_sets):
+            scores[set_i, start:start + len(chunk_guess_ids)] = get_histogram_entropies(histograms[:, set_i],
+                                                                                          int(n_answers[set_i]))
+
+    return scores
+
+
+def get_sampled_entropy_bounds(histograms: np.ndarray, n_sampled: int, n_answers: int, z: float) -> tuple:
+    """estimated entropy of each histogram row counted over a random sample of the answers, with confidence bounds
+
+    A sampled answer carries log2(n_sampled / size of its pattern's group) bits and the plug-in
+    estimate is their mean. It's biased low, which the Miller-Madow term (observed patterns - 1)
+    / (2 n_sampled ln 2) offsets. The bounds are z standard errors either side, shrunk by the
+    finite population correction since the sample is drawn without replacement.
+
+    Keyword arguments:
+    - histograms: (n_guesses, n_patterns) pattern counts over the sampled answers
+    - n_sampled: number of sampled answers
+    - n_answers: number of answers the sample was drawn from
+    - z: width of the bounds in standard errors
+
+    Returns (estimates, lower bounds, upper bounds)
+    """
+    counts_range: np.ndarray = np.arange(n_sampled + 1, dtype=np.float64)
+    count_bits: np.ndarray = counts_range * np.log2(n_sampled / np.maximum(counts_range, 1))
+    count_squared_bits: np.ndarray = count_bits * np.log2(n_sampled / np.maximum(counts_range, 1))
+    means: np.ndarray = count_bits[histograms].sum(axis=1) / n_sampled
+    variances: np.ndarray = np.maximum(count_squared_bits[histograms].sum(axis=1) / n_sampled - means ** 2, 0)
+    population_correction: float = (n_answers - n_sampled) / max(n_answers - 1, 1)
+    errors: np.ndarray = z * np.sqrt(variances / n_sampled * population_correction)
+    estimates: np.ndarray = means + (np.count_nonzero(histograms, axis=1) - 1) / (2 * n_sampled * np.log(2))
+    return estimates, means - errors, estimates + errors
+
+
+def get_sampled_survivor_positions(matrix: np.ndarray,
+                                   answer_ids: np.ndarray,
+                                   guess_ids: np.ndarray,
+                                   n_patterns: int,
+                                   sample_size: int,
+                                   rng: np.random.Generator,
+                                   z: float) -> tuple:
+    """positions in guess_ids of the guesses that may still have the top entropy, found on growing samples
+
+    The answers are shuffled once and the guesses still in the running are scored on the first
+    sample_size of them, then on twice as many, until the sample would be over half the answers.
+    After each round every guess whose upper bound is below the best lower bound is dropped.
+
+    Keyword arguments:
+    - matrix: pattern matrix with one row per allowed guess
+    - answer_ids: columns of the remaining answer words
+    - guess_ids: rows of the guesses to score
+    - n_patterns: number of histogram bins
+    - sample_size: number of answers in the first round
+    - rng: source of the shuffle, seeded for reproducible results
+    - z: width of the confidence bounds in standard errors
+
+    Returns (survivor positions, last estimated entropy of every guess)
+    """
+    n_answers: int = len(answer_ids)
+    shuffled_answer_ids: np.ndarray = rng.permutation(np.asarray(answer_ids))
+    survivors: np.ndarray = np.arange(len(guess_ids))
+    estimates: np.ndarray = np.zeros(len(guess_ids), dtype=np.float64)
+    n_sampled: int = sample_size
+    while n_sampled <= n_answers // 2 and len(survivors) > 1:
+        histograms: np.ndarray = count_patterns(matrix, shuffled_answer_ids[:n_sampled], guess_ids[survivors],
+                                                n_patterns)
+        survivor_estimates, lower_bounds, upper_bounds = get_sampled_entropy_bounds(histograms, n_sampled,
+                                                                                     n_answers, z)
+        estimates[survivors] = survivor_estimates
+        survivors: np.ndarray = survivors[upper_bounds >= lower_bounds.max()]
+        n_sampled *= 2
+    return survivors, estimates
+
+
+def estimate_n_guesses(n_answers: np.ndarray) -> np.ndarray:
+    """rough expected number of guesses to find one of n equally likely answers, the final guess included
+
+    One answer takes one guess and two answers take 1.5, after that it grows with log2(n).
+    """
+    n_answers: np.ndarray = np.maximum(n_answers, 1).astype(np.float64)
+    return 1 + (1 - 1 / n_answers) * (0.5 + 0.5 * np.log2(n_answers))
+
+
+def get_partition_guess_costs(matrix: np.ndarray,
+                              answer_ids: np.ndarray,
+                              patterns: np.ndarray,
+                              guess_ids: np.ndarray,
+                              answer_rows: np.ndarray,
+                              n_patterns: int) -> tuple:
+    """expected guesses to finish every group of answers that share a pattern, for each guess played next
+
+    Playing a guess costs one guess and wins outright when it is the answer. Every group of
+    answers it leaves behind is then finished in estimate_n_guesses(group size) more guesses.
+    The groups left by one guess are mostly tiny, so rather than n_patterns bin histograms per
+    group, each guess's pattern codes (offset by group) are sorted and the equal runs counted.
+
+    Keyword arguments:
+    - matrix: pattern matrix with one row per allowed guess
+    - answer_ids: columns of the answer words to split
+    - patterns: pattern code of each answer in answer_ids, the key the answers are grouped by
+    - guess_ids: rows of the guesses that can be played next, in ascending order
+    - answer_rows: pattern matrix row of every answer column
+    - n_patterns: number of distinct pattern codes
+
+    Returns (size of each group, (n_groups, n_guesses) array of expected guesses)
+    """
+    _, group_ids, group_sizes = np.unique(patterns, return_inverse=True, return_counts=True)
+    order: np.ndarray = np.argsort(group_ids, kind="stable")
+    answer_ids: np.ndarray = np.asarray(answer_ids)[order]
+    group_ids: np.ndarray = group_ids[order]
+    group_offsets: np.ndarray = group_ids.astype(np.int64) * n_patterns
+    n_groups: int = len(group_sizes)
+    run_costs: np.ndarray = np.arange(len(answer_ids) + 1) * estimate_n_guesses(np.arange(len(answer_ids) + 1))
+
+    # a guess that is one of the group's answers solves it in its own run of all green
+    is_member: np.ndarray = np.zeros((n_groups, len(guess_ids)), dtype=np.float64)
+    member_positions: np.ndarray = np.minimum(np.searchsorted(guess_ids, answer_rows[answer_ids]),
+                                              len(guess_ids) - 1)
+    is_guess: np.ndarray = guess_ids[member_positions] == answer_rows[answer_ids]
+    is_member[group_ids[is_guess], member_positions[is_guess]] = 1
+
+    costs: np.ndarray = np.zeros((n_groups, len(guess_ids)), dtype=np.float64)
+    chunk_size: int = max(1, SCORE_CHUNK_CELLS // max(1, len(answer_ids)))
+    for start in range(0, len(guess_ids), chunk_size):
+        chunk_guess_ids: np.ndarray = guess_ids[start:start + chunk_size]
+        keys: np.ndarray = matrix[chunk_guess_ids][:, answer_ids].astype(np.int64) + group_offsets[None, :]
+        keys.sort(axis=1)
+        is_run_start: np.ndarray = np.ones(keys.shape, dtype=bool)
+        is_run_start[:, 1:] = keys[:, 1:] != keys[:, :-1]
+        run_starts: np.ndarray = np.flatnonzero(is_run_start)
+        run_lengths: np.ndarray = np.diff(np.append(run_starts, keys.size))
+        run_bins: np.ndarray = (run_starts // keys.shape[1]) * n_groups + keys.ravel()[run_starts] // n_patterns
+        costs[:, start:start + len(chunk_guess_ids)] = np.bincount(
+            run_bins, weights=run_costs[run_lengths],
+            minlength=len(chunk_guess_ids) * n_groups).reshape(len(chunk_guess_ids), n_groups).T
+
+    # the winning guess's own run costs nothing beyond the guess itself
+    return group_sizes, 1 + (costs - is_member) / group_sizes[:, None]
+
+
+def get_expected_n_guesses(matrix: np.ndarray,
+                           answer_ids: np.ndarray,
+                           guess_id: int,
+                           guess_ids: np.ndarray,
+                           answer_rows: np.ndarray,
+                           n_patterns: int) -> float:
+    """expected guesses to solve the position by playing guess_id and then the best reply, both included
+
+    Keyword arguments:
+    - matrix: pattern matrix with one row per allowed guess
+    - answer_ids: columns of the remaining answer words
+    - guess_id: row of the guess played first
+    - guess_ids: rows of the guesses the reply can be chosen from, in ascending order
+    - answer_rows: pattern matrix row of every answer column
+    - n_patterns: number of distinct pattern codes
+    """
+    answer_ids: np.ndarray = np.asarray(answer_ids)
+    patterns: np.ndarray = np.asarray(matrix[guess_id, answer_ids])
+    group_patterns, group_sizes = np.unique(patterns, return_counts=True)
+    # all green ends the game on this guess and a single answer left takes exactly one more
+    n_guesses: float = float(group_sizes[group_patterns == 0].sum()) + \
+        2.0 * float(group_sizes[(group_sizes == 1) & (group_patterns != 0)].sum())
+    is_open: np.ndarray = np.isin(patterns, group_patterns[(group_sizes > 1) & (group_patterns != 0)])
+    if is_open.any():
+        open_sizes, costs = get_partition_guess_costs(matrix, answer_ids[is_open], patterns[is_open], guess_ids,
+                                                      answer_rows, n_patterns)
+        n_guesses += float((open_sizes * (1 + costs.min(axis=1))).sum())
+    return n_guesses / len(answer_ids)
+
+
+class PatternMatrix:
+    """Precomputed feedback pattern of every allowed guess against every answer word"""
+
+    def __init__(self,
+                 allowed_words: set,
+                 answer_words: set,
+                 cache_folder_name: str = CACHE_FOLDER_NAME,
+                 max_build_bytes: int = BUILD_MEMORY_BYTES) -> None:
+        self.allowed_words: WordDictionary = get_word_dictionary(allowed_words)
+        # pattern matrix row of every answer column, and the answer column of every row (-1 if none)
+        self.answer_rows: np.ndarray = self.allowed_words.get_ids(answer_words)
+        self.answer_words: WordSubset = WordSubset(self.allowed_words, self.answer_rows)
+        self.answer_columns: np.ndarray = np.full(len(self.allowed_words), -1, dtype=np.intp)
+        self.answer_columns[self.answer_rows] = np.arange(len(self.answer_rows))
+        self.word_length: int = self.allowed_words.word_length
+        self.n_patterns: int = get_n_patterns(self.word_length)
+        self.key: str = get_word_lists_key(self.allowed_words, self.answer_words)
+        self.max_build_bytes: int = max_build_bytes
+        self.cache_file_path: str = None
+        if cache_folder_name is not None:
+            self.cache_file_path: str = path.join(getcwd(), cache_folder_name,
+                                                  f"{CACHE_FILE_PREFIX}{self.key}.npy")
+        self.matrix: np.ndarray = self.__load_or_build()
+
+    def __load_or_build(self) -> np.ndarray:
+        """memory-map the cached matrix when present, otherwise build it once and cache it"""
+        expected_shape: tuple = (len(self.allowed_words), len(self.answer_words))
+        if self.cache_file_path is not None and path.isfile(self.cache_file_path):
+            try:
+                matrix: np.ndarray = np.load(self.cache_file_path, mmap_mode="r")
+                if matrix.shape == expected_shape:
+                    return matrix
+            except Exception as e:
+                print(f"{self.cache_file_path} failed to load due to {e}")
+
+        if self.cache_file_path is not None:
+            try:
+                return self.__build_cache(expected_shape)
+            except OSError as e:
+                print(f"Pattern matrix cache write unsuccessful due to {e}")
+        return build_pattern_matrix(self.allowed_words, self.answer_words, self.max_build_bytes)
+
+    def __build_cache(self, shape: tuple) -> np.ndarray:
+        """build straight into a memory-mapped partial file one block at a time, resuming an interrupted build
+
+        Only one block of guesses is ever computed in memory. The partial file is renamed to the
+        cache file once every row is written, so readers never see a partial matrix.
+        """
+        partial_file_path: str = self.cache_file_path[:-len(".npy")] + PARTIAL_FILE_SUFFIX
+        progress_file_path: str = self.cache_file_path[:-len(".npy")] + PROGRESS_FILE_SUFFIX
+        dtype: np.dtype = get_pattern_dtype(self.word_length)
+        makedirs(path.dirname(self.cache_file_path), exist_ok=True)
+
+        first_row: int = self.__get_build_progress(partial_file_path, progress_file_path, shape, dtype)
+        matrix: np.ndarray = np.lib.format.open_memmap(partial_file_path, mode="r+" if first_row > 0 else "w+",
+                                                       dtype=dtype, shape=shape)
+        for start, codes in get_pattern_blocks(self.allowed_words, self.answer_words, first_row,
+                                               self.max_build_bytes):
+            matrix[start:start + len(codes)] = codes
+            matrix.flush()
+            with open(progress_file_path + ".tmp", "w") as f:
+                f.write(str(start + len(codes)))
+            replace(progress_file_path + ".tmp", progress_file_path)
+        del matrix
+
+        replace(partial_file_path, self.cache_file_path)
+        if path.isfile(progress_file_path):
+            remove(progress_file_path)
+        return np.load(self.cache_file_path, mmap_mode="r")
+
+    def __get_build_progress(self, partial_file_path: str, progress_file_path: str, shape: tuple,
+                             dtype: np.dtype) -> int:
+        """rows already written by an interrupted build of the same matrix, 0 to start over"""
+        if not path.isfile(partial_file_path) or not path.isfile(progress_file_path):
+            return 0
+        try:
+            partial: np.ndarray = np.load(partial_file_path, mmap_mode="r")
+            with open(progress_file_path, "r") as f:
+                n_rows: int = int(f.read())
+        except Exception:
+            return 0
+        if partial.shape != shape or partial.dtype != dtype or not 0 <= n_rows <= shape[0]:
+            return 0
+        return n_rows
+
+    def get_pattern(self, guess: str, answer: str) -> int:
+        """look up the pattern code of a single (guess, answer) pair, KeyError if either has no row or column"""
+        guess_id: int = self.allowed_words.get_id(guess)
+        answer_row: int = self.allowed_words.get_id(answer)
+        answer_id: int = self.answer_columns[answer_row] if answer_row >= 0 else -1
+        if guess_id < 0 or answer_id < 0:
+            raise KeyError(f"{guess}, {answer} isn't an allowed guess and answer word pair")
+        return int(self.matrix[guess_id, answer_id])
+
+    def get_answer_ids(self, answer_words) -> np.ndarray:
+        """column indices of a subset of answer words, in ascending order"""
+        answer_ids: np.ndarray = self.answer_columns[self.allowed_words.get_ids(answer_words)]
+        if (answer_ids < 0).any():
+            raise KeyError("some words aren't answer words")
+        return answer_ids
+
+    def get_allowed_ids(self, allowed_words) -> np.ndarray:
+        """row indices of a subset of allowed words, in ascending order"""
+        return self.allowed_words.get_ids(allowed_words)
+
+
+def get_pattern_matrix(allowed_words: set,
+                       answer_words: set,
+                       cache_folder_name: str = CACHE_FOLDER_NAME,
+                       max_build_bytes: int = BUILD_MEMORY_BYTES) -> PatternMatrix:
+    """share one pattern matrix per pair of word lists across the whole process"""
+    key: str = get_word_lists_key(allowed_words, answer_words)
+    if key not in _loaded_matrices:
+        _loaded_matrices[key] = PatternMatrix(allowed_words, answer_words, cache_folder_name, max_build_bytes)
+    return _loaded_matrices[key]
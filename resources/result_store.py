@@ -0,0 +1,133 @@
+import atexit
+from os import path
+import pickle
+import sqlite3
+from threading import Lock
+
+RESULT_STORE_SUFFIX: str = ".sqlite3"
+LEGACY_PICKLE_SUFFIX: str = ".pickle"
+COMMIT_BATCH_SIZE: int = 256
+# how long a writer waits for another process's transaction before giving up
+BUSY_TIMEOUT_MS: int = 10000
+
+_open_stores: dict = dict()
+
+
+class ResultStore:
+    """SQLite table of the guesses the solver played against each known answer
+
+    Rows are (answer, guess number, guess), so one answer's game is looked up on its own
+    instead of loading every result. The database runs in WAL mode with a busy timeout, so
+    simulations in several processes can share it, and new rows are buffered and committed
+    COMMIT_BATCH_SIZE at a time. A legacy pickle of {answer: [guesses]} is imported when the
+    database is created, and left where it is.
+
+    Keyword arguments:
+    - file_path: the database, one per dictionary so games are only replayed with the words they were played with
+    - commit_batch_size: number of new rows committed together
+    - legacy_pickle_path: pickle to import, the database's name with LEGACY_PICKLE_SUFFIX by default
+    - allowed_words: only import the legacy games whose answer and guesses are all in these words
+    """
+
+    def __init__(self,
+                 file_path: str,
+                 commit_batch_size: int = COMMIT_BATCH_SIZE,
+                 legacy_pickle_path: str = None,
+                 allowed_words=None) -> None:
+        self.file_path: str = file_path
+        self.commit_batch_size: int = commit_batch_size
+        # rows added since the last commit
+        self.pending: list = []
+        self.__lock: Lock = Lock()
+        is_new: bool = not path.isfile(file_path)
+        # the solve server opens the store on one thread and flushes it at exit on another
+        self.connection: sqlite3.Connection = sqlite3.connect(file_path, timeout=BUSY_TIMEOUT_MS / 1000,
+                                                              check_same_thread=False)
+        self.connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS optimal_guesses ("
+                                    "answer TEXT NOT NULL, "
+                                    "guess_n INTEGER NOT NULL, "
+                                    "guess TEXT NOT NULL, "
+                                    "PRIMARY KEY (answer, guess_n)) WITHOUT ROWID")
+        if is_new:
+            self.__migrate_pickle(legacy_pickle_path if legacy_pickle_path is not None else
+                                  path.splitext(file_path)[0] + LEGACY_PICKLE_SUFFIX, allowed_words)
+
+    def __migrate_pickle(self, pickle_file_path: str, allowed_words=None) -> None:
+        """import a legacy {answer: [guesses]} pickle into a new database, without touching the pickle"""
+        if not path.isfile(pickle_file_path):
+            return
+        try:
+            with open(pickle_file_path, "rb") as f:
+                answer_guesses: dict = pickle.load(f)
+        except Exception as e:
+            print(f"{pickle_file_path} failed to load due to {e}")
+            return
+        if allowed_words is not None:
+            # the pickle doesn't say which dictionary its games were played with
+            answer_guesses: dict = {answer: guesses for answer, guesses in answer_guesses.items()
+                                    if answer in allowed_words and all(guess in allowed_words for guess in guesses)}
+        with self.__lock, self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO optimal_guesses VALUES (?, ?, ?)",
+                                        [(answer, guess_n, guess) for answer, guesses in answer_guesses.items()
+                                         for guess_n, guess in enumerate(guesses, start=1)])
+
+    def get_guesses(self, answer: str) -> list:
+        """the guesses saved for an answer, in the order they were played"""
+        with self.__lock:
+            rows: list = self.connection.execute("SELECT guess_n, guess FROM optimal_guesses WHERE answer = ?",
+                                                 (answer,)).fetchall()
+            guesses: dict = dict(rows)
+            for pending_answer, guess_n, guess in self.pending:
+                if pending_answer == answer:
+                    guesses.setdefault(guess_n, guess)
+        return [guesses[guess_n] for guess_n in sorted(guesses)]
+
+    def add_guesses(self, answer: str, guesses: list) -> None:
+        """save a game's guesses, keeping any already saved for the same answer and guess number"""
+        with self.__lock:
+            self.pending.extend((answer, guess_n, guess) for guess_n, guess in enumerate(guesses, start=1))
+            is_batch_full: bool = len(self.pending) >= self.commit_batch_size
+        if is_batch_full:
+            self.flush()
+
+    def flush(self) -> None:
+        """commit every pending row in one transaction"""
+        with self.__lock:
+            if len(self.pending) == 0:
+                return
+            with self.connection:
+                self.connection.executemany("INSERT OR IGNORE INTO optimal_guesses VALUES (?, ?, ?)", self.pending)
+            self.pending: list = []
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+
+def get_result_store(file_path: str, legacy_pickle_path: str = None, allowed_words=None) -> ResultStore:
+    """share one open store per database file across the whole process"""
+    file_path: str = path.abspath(file_path)
+    if file_path not in _open_stores:
+        _open_stores[file_path] = ResultStore(file_path, legacy_pickle_path=legacy_pickle_path,
+                                              allowed_words=allowed_words)
+    return _open_stores[file_path]
+
+
+def has_results(file_path: str, legacy_pickle_path: str = None) -> bool:
+    """whether a database or a legacy pickle to migrate exists, without creating anything"""
+    if legacy_pickle_path is None:
+        legacy_pickle_path: str = path.splitext(file_path)[0] + LEGACY_PICKLE_SUFFIX
+    return path.isfile(file_path) or path.isfile(legacy_pickle_path)
+
+
+@atexit.register
+def _flush_open_stores() -> None:
+    for store in _open_stores.values():
+        try:
+            store.flush()
+        except sqlite3.Error as e:
+            print(f"Result store commit unsuccessful due to {e}")
@@ -0,0 +1,48 @@
+import http.client
+import json
+
+DEFAULT_HOST: str = "127.0.0.1"
+DEFAULT_PORT: int = 8765
+
+
+class SolveClient:
+    """Keep-alive client for the solve server, one persistent connection per client"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 30.0) -> None:
+        self.host: str = host
+        self.port: int = port
+        self.timeout: float = timeout
+        self.connection: http.client.HTTPConnection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def __enter__(self) -> "SolveClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def solve(self, guesses: list, colors: list, top_k: int = 10) -> dict:
+        """recommend the next guess for a game state, e.g. solve(["salet"], ["_y___"])
+
+        Returns {"guess", "n_candidates", "top_scores"} or {"error"} for an impossible state
+        """
+        return self.__request("POST", "/solve", {"guesses": guesses, "colors": colors, "top_k": top_k})
+
+    def health(self) -> dict:
+        return self.__request("GET", "/health")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __request(self, method: str, target: str, record: dict = None) -> dict:
+        body: bytes = json.dumps(record).encode("utf-8") if record is not None else None
+        headers: dict = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        # an idle keep-alive connection may have been dropped by the server, retry once on a new one
+        for attempt in range(2):
+            try:
+                self.connection.request(method, target, body=body, headers=headers)
+                response: http.client.HTTPResponse = self.connection.getresponse()
+                return json.loads(response.read())
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.connection.close()
+                if attempt == 1:
+                    raise
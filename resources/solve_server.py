@@ -0,0 +1,227 @@
+from argparse import ArgumentParser
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import numpy as np
+from patterns import get_batch_pattern_entropies
+from wordle import *
+
+DEFAULT_HOST: str = "127.0.0.1"
+DEFAULT_PORT: int = 8765
+DEFAULT_BATCH_WINDOW: float = 0.005
+DEFAULT_MAX_BATCH_SIZE: int = 64
+MAX_BODY_BYTES: int = 1 << 16
+
+HTTP_REASONS: dict = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                      413: "Payload Too Large"}
+
+
+class SolveServer:
+    """Localhost HTTP service that keeps one warm game, its pattern tables and caches in memory
+
+    POST /solve takes {"guesses": [...], "colors": [...], "top_k": 10} and answers with the same
+    JSON as the batch solver. Requests that arrive within batch_window seconds of each other are
+    solved together, and every position that needs scoring is scored in one batched pass.
+    """
+
+    def __init__(self,
+                 wordle: Wordle,
+                 host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT,
+                 batch_window: float = DEFAULT_BATCH_WINDOW,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE) -> None:
+        self.wordle: Wordle = wordle
+        self.host: str = host
+        self.port: int = port
+        self.batch_window: float = batch_window
+        self.max_batch_size: int = max_batch_size
+        self.n_requests: int = 0
+        self.n_batches: int = 0
+        # the game isn't thread safe, so every batch is solved on the same single worker thread
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1)
+        self.__queue: asyncio.Queue = None
+
+    def solve_batch(self, states: list) -> list:
+        """recommend the next guess for every (guesses, colors, top_k) state, in order
+
+        Positions covered by the strategy tree, the opening book or the guess cache are answered
+        right away, repeated positions are scored once and positions with the same guesses share
+        a single scoring pass.
+        """
+        results: list = [None] * len(states)
+        # position key -> [answer ids, guess ids, states waiting on it]
+        positions: dict = dict()
+        solver: WordleSolver = None
+        for i, (guesses, colors, top_k) in enumerate(states):
+            try:
+                self.wordle.set_guide_state(guesses, colors)
+                solver: WordleSolver = self.wordle.solver
+                guess: str = self.wordle.get_unscored_guide_suggestion()
+            except (ValueError, TypeError, AttributeError) as e:
+                results[i] = {"error": str(e)}
+                continue
+            n_candidates: int = len(self.wordle.answer_words)
+            if guess is not None:
+                results[i] = {"guess": guess,
+                              "n_candidates": n_candidates,
+                              "top_scores": solver.get_top_n_word_scores(top_k) if len(solver.top_scores) > 0
+                              else OrderedDict()}
+                continue
+            key: tuple = solver.get_position_key("answer_unknown")
+            if key not in positions:
+                positions[key] = [solver.answer_ids, solver.guess_ids, []]
+            positions[key][2].append((i, n_candidates, top_k))
+
+        # positions are scored together when they share the same guess list, scoring the union of
+        # different lists would cost more than the batching saves
+        groups: dict = dict()
+        for answer_ids, guess_ids, waiting in positions.values():
+            groups.setdefault(guess_ids.tobytes(), []).append((answer_ids, guess_ids, waiting))
+        for group in groups.values():
+            guess_ids: np.ndarray = group[0][1]
+            scores: np.ndarray = get_batch_pattern_entropies(solver.pattern_matrix.matrix,
+                                                             [answer_ids for answer_ids, _, _ in group],
+                                                             guess_ids,
+                                                             solver.pattern_matrix.n_patterns)
+            for position_scores, (answer_ids, _, waiting) in zip(scores, group):
+                solver.answer_ids = answer_ids
+                solver.guess_ids = guess_ids
+                guess: str = solver.set_guess_scores("answer_unknown", position_scores)
+                for i, n_candidates, top_k in waiting:
+                    results[i] = {"guess": guess,
+                                  "n_candidates": n_candidates,
+                                  "top_scores": solver.get_top_n_word_scores(top_k)}
+        return results
+
+    async def solve(self, guesses: list, colors: list, top_k: int = 10) -> dict:
+        """queue one state for the next batch and wait for its result"""
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self.__queue.put(((guesses, colors, top_k), future))
+        return await future
+
+    async def serve_forever(self) -> None:
+        self.__queue: asyncio.Queue = asyncio.Queue()
+        batcher: asyncio.Task = asyncio.create_task(self.__batch_requests())
+        server: asyncio.AbstractServer = await asyncio.start_server(self.__handle_connection, self.host, self.port)
+        print(f"solving on http://{self.host}:{self.port}/solve")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self.executor.shutdown(wait=True)
+
+    async def __batch_requests(self) -> None:
+        """collect requests for up to batch_window seconds, then solve them together off the event loop"""
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        while True:
+            batch: list = [await self.__queue.get()]
+            deadline: float = loop.time() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                timeout: float = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.__queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.n_requests += len(batch)
+            self.n_batches += 1
+            try:
+                results: list = await loop.run_in_executor(self.executor, self.solve_batch,
+                                                           [state for state, _ in batch])
+            except Exception as e:
+                results: list = [{"error": f"internal error: {e}"}] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def __handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """serve HTTP/1.1 requests on one connection until the client closes it"""
+        try:
+            while True:
+                request_line: bytes = await reader.readline()
+                if request_line == b"":
+                    break
+                parts: list = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    await self.__respond(writer, 400, {"error": "malformed request line"}, keep_alive=False)
+                    break
+                method, target, version = parts
+                headers: dict = dict()
+                while True:
+                    header_line: bytes = await reader.readline()
+                    if header_line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header_line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                connection: str = headers.get("connection", "").lower()
+                keep_alive: bool = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                content_length: int = int(headers.get("content-length", "0") or 0)
+                if content_length > MAX_BODY_BYTES:
+                    await self.__respond(writer, 413, {"error": "request body is too large"}, keep_alive=False)
+                    break
+                body: bytes = await reader.readexactly(content_length) if content_length > 0 else b""
+
+                status, result = await self.__route(method, target, body)
+                await self.__respond(writer, status, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def __route(self, method: str, target: str, body: bytes) -> tuple:
+        if target == "/health":
+            return 200, {"status": "ok", "requests": self.n_requests, "batches": self.n_batches}
+        if target != "/solve":
+            return 404, {"error": f"{target} not found"}
+        if method != "POST":
+            return 405, {"error": "use POST /solve"}
+        try:
+            record: dict = json.loads(body)
+            guesses: list = [g.lower() for g in record.get("guesses", [])]
+            colors: list = [c.lower() for c in record.get("colors", [])]
+            top_k: int = int(record.get("top_k", 10))
+        except (ValueError, TypeError, AttributeError) as e:
+            return 400, {"error": f"invalid JSON state: {e}"}
+        return 200, await self.solve(guesses, colors, top_k)
+
+    async def __respond(self, writer: asyncio.StreamWriter, status: int, result: dict, keep_alive: bool) -> None:
+        body: bytes = json.dumps(result).encode("utf-8")
+        head: str = (f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                     "Content-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\n"
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+def main() -> None:
+    parser: ArgumentParser = ArgumentParser(description="serve guide mode advice over HTTP on localhost, "
+                                                        "batching requests that arrive together")
+    parser.add_argument("--language", default="en", help="word list prefix in the data folder, e.g. en or fr")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--batch-window-ms", type=float, default=DEFAULT_BATCH_WINDOW * 1000,
+                        help="how long to wait for more requests before solving a batch")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    args = parser.parse_args()
+
+    answer_words, allowed_words = load_language_words(args.language, Wordle.WORDLE_LENGTH)
+    wordle: Wordle = Wordle(answer_words=answer_words,
+                            allowed_words=allowed_words,
+                            show_output=False,
+                            save_solver_results=False)
+    server: SolveServer = SolveServer(wordle, args.host, args.port, args.batch_window_ms / 1000, args.max_batch_size)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
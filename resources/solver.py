@@ -1,19 +1,59 @@
 from collections import OrderedDict
-from copy import deepcopy
-from itertools import product
+from hashlib import blake2b
+from metrics import MetricsCollector, count, get_metrics, observe, timed
 from miscellaneous import *
-from operator import countOf
-from os import path
+import numpy as np
 from pathvalidate import ValidationError, validate_filename, sanitize_filename
-import pickle
-from scipy.stats import entropy
+from patterns import PatternMatrix, count_patterns, get_expected_n_guesses, get_histogram_entropies, get_pattern_entropies, get_pattern_matrix, get_sampled_survivor_positions, get_top_guess_position
+from result_store import LEGACY_PICKLE_SUFFIX, RESULT_STORE_SUFFIX, ResultStore, get_result_store, has_results
+from strategy import StrategyTree, load_opening_book
 import sys
-from tqdm import tqdm
+from time import perf_counter
+from word_dictionary import WordDictionary
+
+
+class GuessCache:
+    """Process-wide LRU cache of the best guess and top scores of a candidate position"""
+
+    def __init__(self, max_size: int = 4096) -> None:
+        self.max_size: int = max_size
+        self.entries: OrderedDict = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: tuple) -> tuple:
+        """cached (top_scoring_word, top_scores) of a position, or None"""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: tuple, value: tuple) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits: int = 0
+        self.misses: int = 0
+
 
 class WordleSolver:
     """Solve a wordle puzzle by utilizing information theory"""
     WORD_LENGTH: int = 5
     OPTIMAL_FIRST_GUESS: str = "salet"
+    GUESS_CACHE: GuessCache = GuessCache()
+    # wall clock budget of one lookahead move, scoring included
+    LOOKAHEAD_SECONDS: float = 0.5
+    # width of the sampled scoring confidence bounds, in standard errors
+    SAMPLE_CONFIDENCE_Z: float = 3.0
 
     def __init__(self, 
                  answer_words: set, 
@@ -21,15 +61,67 @@ class WordleSolver:
                  guess_n: int,
                  game_answer: str,
                  show_output: bool,
-                 pickle_file_name: str = "answer_optimal_guesses") -> None:
+                 results_file_name: str = "answer_optimal_guesses",
+                 pattern_matrix: PatternMatrix = None,
+                 n_workers: int = 1,
+                 use_cache: bool = True,
+                 use_opening_book: bool = True,
+                 use_incremental_histograms: bool = True,
+                 lookahead_top_k: int = 0,
+                 lookahead_seconds: float = LOOKAHEAD_SECONDS,
+                 first_guess: str = None,
+                 prefilter_top_m: int = 0,
+                 sample_size: int = 0,
+                 sample_seed: int = None) -> None:
         self.answer_words: list = answer_words
         self.allowed_words: list = allowed_words
-        self.words_scores: OrderedDict = OrderedDict()
+        self.answer_ids: np.ndarray = np.empty(0, dtype=np.intp)
+        self.guess_ids: np.ndarray = np.empty(0, dtype=np.intp)
+        self.guess_scores: np.ndarray = np.empty(0, dtype=np.float64)
+        # top scores of the last get_optimal_guess call, empty when no scoring was needed
+        self.top_scores: OrderedDict = OrderedDict()
+        # how the last guess was found, e.g. "opening_book", "cache" or "scored"
+        self.guess_source: str = None
         self.guess_n: int = guess_n
         self.show_output: bool = show_output
         self.answer: str = game_answer
-        self.pickle_file_path: str = self.__validate_file_name(pickle_file_name) + ".pickle"
-        self.answer_entropy_guesses: dict = self.__read_dict_pickle()
+        # opt-in: a fixed first guess, whose games are saved apart from the default opener's
+        self.first_guess: str = first_guess
+        if first_guess is not None:
+            results_file_name: str = f"{results_file_name}_{first_guess}"
+        self.pattern_matrix: PatternMatrix = pattern_matrix if pattern_matrix is not None else get_pattern_matrix(
+            allowed_words, answer_words)
+        results_file_name: str = self.__validate_file_name(results_file_name)
+        # each pair of word lists saves its games apart, named after their fingerprint like the pattern matrix
+        self.results_file_path: str = f"{results_file_name}_{self.pattern_matrix.key}{RESULT_STORE_SUFFIX}"
+        self.legacy_results_file_path: str = results_file_name + LEGACY_PICKLE_SUFFIX
+        # guesses saved for this game's answer, extended with the guesses played in this game
+        self.answer_guesses: list = self.__read_answer_guesses()
+        # opt-in: score guesses across a process pool when more than one worker is requested
+        self.n_workers: int = n_workers
+        self.use_cache: bool = use_cache
+        self.opening_book: StrategyTree = load_opening_book(self.pattern_matrix) if use_opening_book else None
+        # the book only covers games that open with its own first guess
+        if self.opening_book is not None and first_guess is not None and self.opening_book.first_guess != first_guess:
+            self.opening_book: StrategyTree = None
+        # (guess, pattern) pairs played so far, the path followed through the opening book
+        self.guess_patterns: list = []
+        # pattern histograms of the last scored position, shrunk as answers are ruled out
+        self.use_incremental_histograms: bool = use_incremental_histograms
+        self.__histograms: np.ndarray = None
+        self.__histogram_answer_ids: np.ndarray = None
+        self.__histogram_guess_ids: np.ndarray = None
+        # opt-in: rescore the top k single step guesses by expected guesses left, within a per move deadline
+        self.lookahead_top_k: int = lookahead_top_k
+        self.lookahead_seconds: float = lookahead_seconds
+        # expected guesses to finish of the guesses the last lookahead move got to, best first
+        self.lookahead_scores: OrderedDict = OrderedDict()
+        # opt-in: only score the top m guesses by letter coverage of the remaining answers
+        self.prefilter_top_m: int = prefilter_top_m
+        # opt-in: drop guesses whose entropy on a sample of at least this many answers can't be the best,
+        # then score the rest exactly
+        self.sample_size: int = sample_size
+        self.rng: np.random.Generator = np.random.default_rng(sample_seed)
         
     def __validate_file_name(self, file_name) -> str:
         try:
@@ -41,34 +133,44 @@ class WordleSolver:
             fname: str = sanitize_filename(fname) 
         return fname
         
-    def __read_dict_pickle(self) -> dict():
-        if path.isfile(self.pickle_file_path):
-            with open(self.pickle_file_path, "rb") as f:
-                try:
-                    return pickle.load(f)
-                except Exception as e: 
-                    print(f"{self.pickle_file_path} failed to load due to {e}")
-        return dict() 
-    
+    def __read_answer_guesses(self) -> list:
+        """look up the saved game of this answer only, without creating a store that doesn't exist yet
+
+        A saved game with a guess this game doesn't allow is ignored rather than replayed.
+        """
+        if self.answer is None or not self.has_results():
+            return []
+        with timed("read_results"):
+            guesses: list = self.get_result_store().get_guesses(self.answer)
+        return guesses if all(guess in self.allowed_words for guess in guesses) else []
+
     def __save_optimal_guess(self, optimal_guess: str) -> None:
         """If the game answer is known, we can save the results of the entropy optimal guess for future solves"""
-        if self.answer is not None: # answer is known, we can save the optimal inputs of that game 
-            if self.answer not in self.answer_entropy_guesses:
-                self.answer_entropy_guesses[self.answer] = [optimal_guess]
-            elif optimal_guess not in self.answer_entropy_guesses[self.answer]:
-                self.answer_entropy_guesses[self.answer].append(optimal_guess)
+        if self.answer is not None and optimal_guess not in self.answer_guesses:
+            self.answer_guesses.append(optimal_guess)
             
-    def _Wordle__update_solver_info(self, answer_words: set, allowed_words: set, guess_n: int) -> None:
+    def _Wordle__update_solver_info(self, answer_words: set, allowed_words: set, guess_n: int, guess_patterns: list = None) -> None:
         self.answer_words: set = answer_words
         self.allowed_words: set = allowed_words
         self.guess_n: int = guess_n
+        if guess_patterns is not None:
+            self.guess_patterns: list = guess_patterns
         
-    def _Wordle__write_dict_pickle(self) -> None:
-        with open(self.pickle_file_path, "wb") as f:
-            try:
-                pickle.dump(self.answer_entropy_guesses, f)
-            except Exception as e:
-                print(f"Pickle dump unsuccessful due to {e}")
+    def _Wordle__write_results(self) -> None:
+        """queue this game's guesses in the result store, which commits them in batches"""
+        if self.answer is None:
+            return
+        with timed("write_results"):
+            self.get_result_store().add_guesses(self.answer, self.answer_guesses)
+
+    def has_results(self) -> bool:
+        """whether this dictionary has saved games, or a legacy pickle to import, without creating a store"""
+        return has_results(self.results_file_path, self.legacy_results_file_path)
+
+    def get_result_store(self) -> ResultStore:
+        """this dictionary's store of saved games, created on first use"""
+        return get_result_store(self.results_file_path, self.legacy_results_file_path,
+                                self.pattern_matrix.allowed_words)
     
     def get_top_n_word_scores(self, n: int) -> OrderedDict:
         """Retrieve the nth highest score words, if possible
@@ -76,89 +178,262 @@ class WordleSolver:
         Keyword arguments:
         - n: an unsigned integer value
         """
-        all_scores: OrderedDict = deepcopy(self.words_scores)
-        n: int = len(all_scores) if len(all_scores) < n else n
-        n_scores: OrderedDict = OrderedDict()
-        for _ in range(n):
-            key: str = max(all_scores, key=all_scores.get)
-            n_scores[key] = all_scores[key]
-            del all_scores[key]
-        return n_scores
-    
+        n: int = len(self.guess_scores) if len(self.guess_scores) < n else n
+        # stable sort keeps equally scored words in alphabetical order
+        top_positions: np.ndarray = np.argsort(-self.guess_scores, kind="stable")[:n]
+        allowed_words: WordDictionary = self.pattern_matrix.allowed_words
+        return OrderedDict((allowed_words[self.guess_ids[i]], float(self.guess_scores[i])) for i in top_positions)
+
+    @property
+    def words_scores(self) -> OrderedDict:
+        """every scored guess mapped to its single step entropy"""
+        allowed_words: WordDictionary = self.pattern_matrix.allowed_words
+        return OrderedDict((allowed_words[guess_id], float(score))
+                           for guess_id, score in zip(self.guess_ids, self.guess_scores))
+
     def get_optimal_guess(self, game_mode:str = "answer_known") -> str:
         """produce an optimal word based on probability and expected information"""
         assert game_mode in ["answer_known", "answer_unknown"]
         assert self.guess_n > 0
+        metrics: MetricsCollector = get_metrics()
+        start: float = perf_counter() if metrics is not None else 0.0
         
-        if self.guess_n == 1:
-            top_scoring_word: str = WordleSolver.OPTIMAL_FIRST_GUESS  
-        elif game_mode == "answer_known":
-            if self.answer in self.answer_entropy_guesses and len(self.answer_entropy_guesses[self.answer]) >= self.guess_n:
-                entropy_guesses: list = self.answer_entropy_guesses[self.answer]
-                top_scoring_word: str = entropy_guesses[self.guess_n - 1]
-            # if there's only one answer left, avoid any calculations
-            elif len(self.answer_words) == 1:
-                top_scoring_word: str = self.answer_words.pop()
-            # otherwise, use one step entropy to find the optimal next guess
-            else:
-                self.words_scores: OrderedDict = self.__assign_scores_to_possible_guesses()
-                top_scores: OrderedDict = self.get_top_n_word_scores(10) if len(self.words_scores) > 10 else self.get_top_n_word_scores(len(self.words_scores))
-                if self.show_output:
-                    for word, score in top_scores.items():
-                        print(f"{word}: {score}")
-                top_scoring_word: str = max(top_scores, key=top_scores.get) 
-                top_score: float = top_scores[top_scoring_word]
-
-                # try to use a word that's in answer_words if there are multiple words with the same top score
-                if countOf(top_scores.values(), top_score) > 1:
-                    for word, score in self.words_scores.items():
-                        if score == top_score and word in self.answer_words:
-                            top_scoring_word: str = word
-            # save the optimal parameters of this game if answer is known
+        top_scoring_word: str = self.get_unscored_guess(game_mode)
+        # otherwise, use one step entropy to find the optimal next guess
+        if top_scoring_word is None:
+            top_scoring_word: str = self.get_scored_guess(game_mode)
+        if metrics is not None:
+            seconds: float = perf_counter() - start
+            metrics.add_time("get_optimal_guess", seconds)
+            metrics.record_move(self.guess_n, len(self.answer_words), len(self.allowed_words), self.guess_source,
+                                seconds)
+        if self.show_output and game_mode == "answer_known":
+            for word, score in self.top_scores.items():
+                print(f"{word}: {score}")
+
+        # save the optimal parameters of this game if answer is known
+        if game_mode == "answer_known":
             self.__save_optimal_guess(top_scoring_word)
+        return top_scoring_word
+
+    def get_unscored_guess(self, game_mode: str = "answer_known") -> str:
+        """the next guess when no scoring is needed (a replayed game, the opening book, the
+        first guess, a single remaining answer or a cached position), otherwise None"""
+        self.top_scores: OrderedDict = OrderedDict()
+        book_guess: str = self.opening_book.get_guess(self.guess_patterns) if self.opening_book is not None else None
+        if game_mode == "answer_known" and len(self.answer_guesses) >= self.guess_n:
+            self.guess_source: str = "saved_game"
+            return self.answer_guesses[self.guess_n - 1]
+        # moves covered by the dictionary's opening book need no scoring at all
+        elif book_guess is not None:
+            self.guess_source: str = "opening_book"
+            return book_guess
+        elif self.guess_n == 1:
+            self.guess_source: str = "first_guess"
+            return self.first_guess if self.first_guess is not None else WordleSolver.OPTIMAL_FIRST_GUESS
+        # if there's only one answer left, avoid any calculations
+        elif game_mode == "answer_known" and len(self.answer_words) == 1:
+            self.guess_source: str = "single_answer"
+            return next(iter(self.answer_words))
+
+        self.answer_ids: np.ndarray = self.pattern_matrix.get_answer_ids(self.answer_words)
+        self.guess_ids: np.ndarray = self.pattern_matrix.get_allowed_ids(self.allowed_words)
+        if 0 < self.prefilter_top_m < len(self.guess_ids):
+            with timed("prefilter_guesses"):
+                self.guess_ids: np.ndarray = self.__get_prefiltered_guess_ids()
+        if not self.use_cache:
+            return None
+        cached: tuple = WordleSolver.GUESS_CACHE.get(self.get_position_key(game_mode))
+        if cached is None:
+            count("guess_cache_misses")
+            return None
+        count("guess_cache_hits")
+        self.guess_source: str = "cache"
+        top_scoring_word, top_scores = cached
+        # only the top scores survive in the cache, keep get_top_n_word_scores consistent with them
+        self.guess_ids: np.ndarray = np.array([self.pattern_matrix.allowed_words.get_id(w) for w in top_scores],
+                                             dtype=np.intp)
+        self.guess_scores: np.ndarray = np.array(list(top_scores.values()), dtype=np.float64)
+        self.top_scores: OrderedDict = OrderedDict(top_scores)
+        return top_scoring_word
+
+    def get_scored_guess(self, game_mode: str = "answer_known") -> str:
+        """score every allowed guess of the position left by get_unscored_guess and pick the best one"""
+        start: float = perf_counter()
+        self.guess_source: str = "scored"
+        self.lookahead_scores: OrderedDict = OrderedDict()
+        top_position: int = None
+        if 0 < self.sample_size <= len(self.answer_ids) // 2:
+            self.guess_source: str = "sampled"
+            with timed("sampled_scoring"):
+                guess_scores, top_position = self.__get_sampled_scores()
         else:
-            self.words_scores: OrderedDict = self.__assign_scores_to_possible_guesses()
-            top_scores: OrderedDict = self.get_top_n_word_scores(10) if len(self.words_scores) > 10 else self.get_top_n_word_scores(len(self.words_scores))
-            top_scoring_word: str = max(top_scores, key=top_scores.get) 
-            top_score: float = top_scores[top_scoring_word]
-
-            # try to use a word that's in answer_words if there are multiple words with the same top score
-            if countOf(top_scores.values(), top_score) > 1:
-                for word, score in self.words_scores.items():
-                    if score == top_score and word in self.answer_words:
-                        top_scoring_word: str = word 
-        
+            guess_scores: np.ndarray = self.__assign_scores_to_possible_guesses()
+        if self.lookahead_top_k > 1 and len(self.answer_ids) > 2:
+            self.guess_source: str = "lookahead"
+            with timed("lookahead"):
+                top_position: int = self.__get_lookahead_position(guess_scores, start + self.lookahead_seconds)
+        return self.set_guess_scores(game_mode, guess_scores, top_position)
+
+    def __get_sampled_scores(self) -> tuple:
+        """exact entropy of the guesses that survive sampled scoring, the sampled estimate of the others
+
+        Returns (scores of every guess in guess_ids, position of the best survivor)
+        """
+        candidate_guess_ids: np.ndarray = self.pattern_matrix.answer_rows[self.answer_ids]
+        survivors, guess_scores = get_sampled_survivor_positions(self.pattern_matrix.matrix,
+                                                                 self.answer_ids,
+                                                                 self.guess_ids,
+                                                                 self.pattern_matrix.n_patterns,
+                                                                 self.sample_size,
+                                                                 self.rng,
+                                                                 WordleSolver.SAMPLE_CONFIDENCE_Z)
+        observe("sampled_survivors", len(survivors))
+        guess_scores[survivors] = get_pattern_entropies(self.pattern_matrix.matrix,
+                                                        self.answer_ids,
+                                                        self.guess_ids[survivors],
+                                                        self.pattern_matrix.n_patterns)
+        # a dropped guess's estimate is kept for reporting, but only a survivor is played
+        best: int = get_top_guess_position(guess_scores[survivors], self.guess_ids[survivors], candidate_guess_ids)
+        return guess_scores, int(survivors[best])
+
+    def __get_lookahead_position(self, guess_scores: np.ndarray, deadline: float) -> int:
+        """position of the guess among the top lookahead_top_k with the fewest expected guesses
+
+        Guesses are rescored in order of their single step entropy, each by the expected number of
+        guesses to finish when it's followed by its best reply. Once the deadline passes no further
+        guess is started and the best one rescored so far wins, or the single step best if none was.
+
+        Keyword arguments:
+        - guess_scores: single step entropy of each guess in guess_ids
+        - deadline: perf_counter time by which the move should be chosen
+        """
+        candidate_guess_ids: np.ndarray = self.pattern_matrix.answer_rows[self.answer_ids]
+        # candidate answers go first among equal scores, as they do for the single step pick
+        is_candidate: np.ndarray = np.isin(self.guess_ids, candidate_guess_ids)
+        top_positions: np.ndarray = np.lexsort((~is_candidate, -guess_scores))[:self.lookahead_top_k]
+        rescored_positions: list = []
+        n_guesses: list = []
+        for position in top_positions:
+            if perf_counter() >= deadline:
+                count("lookahead_deadline_hits")
+                break
+            rescored_positions.append(position)
+            n_guesses.append(get_expected_n_guesses(self.pattern_matrix.matrix, self.answer_ids,
+                                                    self.guess_ids[position], self.guess_ids,
+                                                    self.pattern_matrix.answer_rows, self.pattern_matrix.n_patterns))
+        observe("lookahead_guesses", len(rescored_positions))
+        if len(rescored_positions) == 0:
+            return get_top_guess_position(guess_scores, self.guess_ids, candidate_guess_ids)
+
+        allowed_words: WordDictionary = self.pattern_matrix.allowed_words
+        rescored_positions: np.ndarray = np.array(rescored_positions)
+        n_guesses: np.ndarray = np.array(n_guesses)
+        self.lookahead_scores: OrderedDict = OrderedDict(
+            (allowed_words[self.guess_ids[rescored_positions[i]]], float(n_guesses[i]))
+            for i in np.argsort(n_guesses, kind="stable"))
+        best: int = get_top_guess_position(-n_guesses, self.guess_ids[rescored_positions], candidate_guess_ids)
+        return int(rescored_positions[best])
+
+    def get_position_key(self, game_mode: str) -> tuple:
+        """cheap fingerprint of the position: word lists, game mode and both candidate id arrays"""
+        fingerprint = blake2b(self.answer_ids.tobytes(), digest_size=16)
+        fingerprint.update(b"|")
+        fingerprint.update(self.guess_ids.tobytes())
+        return (self.pattern_matrix.key, game_mode, self.lookahead_top_k, self.sample_size, fingerprint.digest())
+
+    def set_guess_scores(self, game_mode: str, guess_scores: np.ndarray, top_position: int = None) -> str:
+        """take the scores of every guess in guess_ids, pick the best one and remember the top ten scores
+
+        Keyword arguments:
+        - game_mode: "answer_known" or "answer_unknown", part of the cache key
+        - guess_scores: single step entropy of each guess in guess_ids, e.g. from a batched pass
+        - top_position: position in guess_ids of the guess to play, the top score if omitted
+        """
+        self.guess_scores: np.ndarray = guess_scores
+        self.top_scores: OrderedDict = self.get_top_n_word_scores(10)
+
+        # try to use a word that's in answer_words if there are multiple words with the same top score
+        if top_position is None:
+            top_position: int = get_top_guess_position(self.guess_scores,
+                                                       self.guess_ids,
+                                                       self.pattern_matrix.answer_rows[self.answer_ids])
+        top_scoring_word: str = self.pattern_matrix.allowed_words[self.guess_ids[top_position]]
+        if self.use_cache:
+            WordleSolver.GUESS_CACHE.put(self.get_position_key(game_mode), (top_scoring_word, OrderedDict(self.top_scores)))
         return top_scoring_word
 
-    def __assign_scores_to_possible_guesses(self) -> OrderedDict:
-        """assign an individual score to each word based on single step entropy"""
-        word_scores: OrderedDict = OrderedDict()
+    def __get_prefiltered_guess_ids(self) -> np.ndarray:
+        """the prefilter_top_m guesses covering the remaining answers' letters best, plus every candidate answer"""
+        codes: np.ndarray = self.pattern_matrix.allowed_words.codes
+        candidate_guess_ids: np.ndarray = self.pattern_matrix.answer_rows[self.answer_ids]
+        scores: np.ndarray = get_coverage_scores(codes[self.guess_ids], codes[candidate_guess_ids],
+                                                 len(self.pattern_matrix.allowed_words.alphabet))
+        top_positions: np.ndarray = np.argpartition(-scores, self.prefilter_top_m - 1)[:self.prefilter_top_m]
+        observe("prefiltered_guesses", len(top_positions))
+        return np.union1d(self.guess_ids[top_positions],
+                          np.intersect1d(self.guess_ids, candidate_guess_ids, assume_unique=True))
 
-        pbar = tqdm(self.allowed_words, disable = not self.show_output)
-        for guess in pbar:
-            guess_score: float = self.__entropy_score(guess)
-            word_scores[guess] = guess_score
-            
-        return word_scores
+    def __assign_scores_to_possible_guesses(self) -> np.ndarray:
+        """assign an individual score to each word based on single step entropy, in a single batched pass"""
+        observe("scored_answers", len(self.answer_ids))
+        observe("scored_guesses", len(self.guess_ids))
+        with timed("score_guesses"):
+            if self.n_workers > 1:
+                # process pools are opt-in, so their modules aren't imported with the solver
+                from parallel_scoring import get_parallel_scorer
+
+                return get_parallel_scorer(self.pattern_matrix, self.n_workers).score(self.answer_ids,
+                                                                                       self.guess_ids)
+            if self.use_incremental_histograms:
+                return get_histogram_entropies(self.__get_pattern_histograms(), len(self.answer_ids))
+            return get_pattern_entropies(self.pattern_matrix.matrix,
+                                         self.answer_ids,
+                                         self.guess_ids,
+                                         self.pattern_matrix.n_patterns)
+
+    def __get_pattern_histograms(self) -> np.ndarray:
+        """pattern histograms of the current guesses over the current answers
+
+        Answers only ever get ruled out during a game, so the previous histograms are
+        updated by subtracting the removed answers' patterns. When more answers were
+        removed than kept, counting the kept ones from scratch is cheaper.
+        """
+        matrix: np.ndarray = self.pattern_matrix.matrix
+        n_patterns: int = self.pattern_matrix.n_patterns
+        is_shrunk_position: bool = self.__histograms is not None and \
+            np.isin(self.answer_ids, self.__histogram_answer_ids, assume_unique=True).all() and \
+            np.isin(self.guess_ids, self.__histogram_guess_ids, assume_unique=True).all()
 
-    def __entropy_score(self, guess: str) -> float:
+        if is_shrunk_position:
+            removed_answer_ids: np.ndarray = np.setdiff1d(self.__histogram_answer_ids, self.answer_ids,
+                                                          assume_unique=True)
+            is_shrunk_position: bool = len(removed_answer_ids) <= len(self.answer_ids)
+        if not is_shrunk_position:
+            self.__histograms: np.ndarray = count_patterns(matrix, self.answer_ids, self.guess_ids, n_patterns)
+        else:
+            kept_rows: np.ndarray = np.searchsorted(self.__histogram_guess_ids, self.guess_ids)
+            self.__histograms: np.ndarray = self.__histograms[kept_rows]
+            if len(removed_answer_ids) > 0:
+                self.__histograms -= count_patterns(matrix, removed_answer_ids, self.guess_ids, n_patterns)
+        self.__histogram_answer_ids: np.ndarray = self.answer_ids
+        self.__histogram_guess_ids: np.ndarray = self.guess_ids
+        return self.__histograms
+
+    def __entropy_score(self, guess: str, answer_ids: np.ndarray = None) -> float:
         """assign a score to the guess based on 1 step entropy
         NOTE: E[info] = sum(probability(pattern_i) * log2(1/probability(pattern_i)) over all patterns
         Keyword arguments:
         - guess: a valid Wordle word (lowercase ascii string five chars long)
+        - answer_ids: pattern matrix columns of the remaining answer words
         """
-        
-        pattern_match_counts: list = []
-
-        for wordle_pattern in product([char_is_green,
-                                       char_is_yellow_safe,
-                                       char_is_grey],
-                                      repeat = WordleSolver.WORD_LENGTH):
-            pattern_match_count: int = 0
-            for possible_answer in self.answer_words:
-                if all([wordle_pattern[letter_i](guess, letter_i, possible_answer) for letter_i in range(WordleSolver.WORD_LENGTH)]):
-                    pattern_match_count += 1
-            pattern_match_counts.append(pattern_match_count)
-        probabilities: list = [float(specific_count)/len(self.answer_words) for specific_count in pattern_match_counts]
-        
-        return entropy(probabilities, base=2)
\ No newline at end of file
+        # scipy is only needed by this legacy path, so it isn't imported with the solver
+        from scipy.stats import entropy
+
+        if answer_ids is None:
+            answer_ids: np.ndarray = self.pattern_matrix.get_answer_ids(self.answer_words)
+        guess_patterns: np.ndarray = self.pattern_matrix.matrix[self.pattern_matrix.allowed_words.get_id(guess)]
+        pattern_match_counts: np.ndarray = np.bincount(guess_patterns[answer_ids],
+                                                       minlength=self.pattern_matrix.n_patterns)
+
+        return entropy(pattern_match_counts, base=2)
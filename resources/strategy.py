@@ -0,0 +1,188 @@
+from argparse import ArgumentParser
+from collections import deque
+from miscellaneous import *
+import numpy as np
+from os import makedirs, replace
+from patterns import *
+from word_index import WordIndex, get_word_index
+
+STRATEGY_FILE_PREFIX: str = "strategy_"
+OPENING_BOOK_FILE_PREFIX: str = "opening_book_"
+OPENING_BOOK_DEPTH: int = 3
+MAX_GUESS_N: int = 6
+ROOT_KEY: int = -1
+
+_loaded_opening_books: dict = dict()
+
+
+class StrategyTree:
+    """Decision tree of (guess, feedback pattern) -> next guess, stored as two int64 rows
+
+    Nodes are laid out breadth first. Row 0 of the stored array holds each node's key,
+    parent_node * n_patterns + pattern (the root's key is -1), and row 1 holds the
+    pattern matrix row of the node's guess. Breadth first order keeps the keys sorted,
+    so a child is found with one binary search over a memory-mapped file.
+    """
+
+    def __init__(self, pattern_matrix: PatternMatrix, nodes: np.ndarray) -> None:
+        self.pattern_matrix: PatternMatrix = pattern_matrix
+        self.nodes: np.ndarray = nodes
+        self.keys: np.ndarray = nodes[0]
+        self.guess_ids: np.ndarray = nodes[1]
+
+    @property
+    def first_guess(self) -> str:
+        return self.pattern_matrix.allowed_words[int(self.guess_ids[0])]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def get_guess(self, guess_patterns: list) -> str:
+        """follow (guess, pattern) pairs from the root and return the next guess, if the tree covers it
+
+        Keyword arguments:
+        - guess_patterns: the game's guesses so far, each paired with its pattern code
+        """
+        node: int = 0
+        for guess, pattern in guess_patterns:
+            if self.pattern_matrix.allowed_words[int(self.guess_ids[node])] != guess:
+                return None
+            key: int = node * self.pattern_matrix.n_patterns + pattern
+            node: int = int(np.searchsorted(self.keys, key))
+            if node >= len(self.keys) or self.keys[node] != key:
+                return None
+        return self.pattern_matrix.allowed_words[int(self.guess_ids[node])]
+
+    def save(self, file_path: str) -> None:
+        makedirs(path.dirname(file_path), exist_ok=True)
+        tmp_file_path: str = file_path + ".tmp"
+        with open(tmp_file_path, "wb") as f:
+            np.save(f, np.asarray(self.nodes))
+        replace(tmp_file_path, file_path)
+
+
+def get_strategy_file_path(pattern_matrix: PatternMatrix,
+                           first_guess: str,
+                           folder_name: str = CACHE_FOLDER_NAME,
+                           file_prefix: str = STRATEGY_FILE_PREFIX) -> str:
+    return path.join(getcwd(), folder_name, f"{file_prefix}{pattern_matrix.key}_{first_guess}.npy")
+
+
+def load_strategy_tree(pattern_matrix: PatternMatrix, file_path: str) -> StrategyTree:
+    """lazily memory-map a saved tree, or return None when there isn't a usable one"""
+    if not path.isfile(file_path):
+        return None
+    try:
+        nodes: np.ndarray = np.load(file_path, mmap_mode="r")
+    except Exception as e:
+        print(f"{file_path} failed to load due to {e}")
+        return None
+    if nodes.ndim != 2 or nodes.shape[0] != 2 or nodes.shape[1] == 0:
+        return None
+    return StrategyTree(pattern_matrix, nodes)
+
+
+def get_opening_book_file_path(pattern_matrix: PatternMatrix, folder_name: str = CACHE_FOLDER_NAME) -> str:
+    """opening books are shipped per dictionary, named after the word lists' fingerprint"""
+    return path.join(getcwd(), folder_name, f"{OPENING_BOOK_FILE_PREFIX}{pattern_matrix.key}.npy")
+
+
+def load_opening_book(pattern_matrix: PatternMatrix) -> StrategyTree:
+    """load the dictionary's opening book once per process, None if it wasn't shipped"""
+    if pattern_matrix.key not in _loaded_opening_books:
+        _loaded_opening_books[pattern_matrix.key] = load_strategy_tree(pattern_matrix,
+                                                                       get_opening_book_file_path(pattern_matrix))
+    return _loaded_opening_books[pattern_matrix.key]
+
+
+def get_best_first_guess(pattern_matrix: PatternMatrix) -> str:
+    """the highest single step entropy guess against every answer word"""
+    all_guess_ids: np.ndarray = np.arange(len(pattern_matrix.allowed_words))
+    return pattern_matrix.allowed_words[get_best_guess_id(pattern_matrix,
+                                                          np.arange(len(pattern_matrix.answer_words)),
+                                                          all_guess_ids)]
+
+
+def get_best_guess_id(pattern_matrix: PatternMatrix, answer_ids: np.ndarray, guess_ids: np.ndarray) -> int:
+    """the guess the solver would pick for these candidates: top entropy, candidates first on ties"""
+    scores: np.ndarray = get_pattern_entropies(pattern_matrix.matrix, answer_ids, guess_ids,
+                                               pattern_matrix.n_patterns)
+    top_position: int = get_top_guess_position(scores, guess_ids, pattern_matrix.answer_rows[answer_ids])
+    return int(guess_ids[top_position])
+
+
+def build_strategy_tree(pattern_matrix: PatternMatrix,
+                        first_guess: str,
+                        max_depth: int = MAX_GUESS_N) -> StrategyTree:
+    """expand every feedback pattern breadth first, choosing each reply with single step entropy
+
+    Keyword arguments:
+    - pattern_matrix: guess x answer patterns of the dictionary
+    - first_guess: guess at the root of the tree
+    - max_depth: deepest guess number to store, e.g. 2 for a first guess and its replies
+    """
+    word_index: WordIndex = get_word_index(pattern_matrix.allowed_words)
+    all_green: int = 0
+    node_keys: list = [ROOT_KEY]
+    node_guess_ids: list = [pattern_matrix.allowed_words.get_id(first_guess)]
+    queue: deque = deque([(0, np.arange(len(pattern_matrix.answer_words)), word_index.all_bits, 1)])
+
+    while len(queue) > 0:
+        node, answer_ids, allowed_bits, depth = queue.popleft()
+        if depth >= max_depth:
+            continue
+        guess_id: int = node_guess_ids[node]
+        guess: str = pattern_matrix.allowed_words[guess_id]
+        patterns: np.ndarray = np.asarray(pattern_matrix.matrix[guess_id, answer_ids])
+        for pattern in np.unique(patterns):
+            if pattern == all_green:
+                continue
+            child_answer_ids: np.ndarray = answer_ids[patterns == pattern]
+            child_allowed_bits: int = allowed_bits
+            for letter in get_absent_letters(guess, int(pattern)):
+                child_allowed_bits &= ~word_index.with_letter(letter)
+            child_guess_id: int = get_best_guess_id(pattern_matrix, child_answer_ids,
+                                                    word_index.get_ids(child_allowed_bits))
+            node_keys.append(node * pattern_matrix.n_patterns + int(pattern))
+            node_guess_ids.append(child_guess_id)
+            queue.append((len(node_keys) - 1, child_answer_ids, child_allowed_bits, depth + 1))
+
+    return StrategyTree(pattern_matrix, np.array([node_keys, node_guess_ids], dtype=np.int64))
+
+
+def main() -> None:
+    parser: ArgumentParser = ArgumentParser(description="build the full guide mode strategy tree of a dictionary, "
+                                                        "or the shallow opening book the solver ships with")
+    parser.add_argument("--language", default="en", help="word list prefix in the data folder, e.g. en or fr")
+    parser.add_argument("--first-guess", default=None,
+                        help="guess at the root of the tree (salet for a full tree, computed for an opening book)")
+    parser.add_argument("--word-length", type=int, default=5)
+    parser.add_argument("--opening-book", action="store_true", help="build a depth limited opening book")
+    parser.add_argument("--max-depth", type=int, default=None,
+                        help=f"deepest guess number to store (opening book default {OPENING_BOOK_DEPTH})")
+    parser.add_argument("--build-memory-mb", type=int, default=BUILD_MEMORY_BYTES >> 20,
+                        help="memory ceiling of each block while the pattern matrix is built")
+    args = parser.parse_args()
+
+    answer_words, allowed_words = load_language_words(args.language, args.word_length)
+
+    pattern_matrix: PatternMatrix = get_pattern_matrix(allowed_words, answer_words,
+                                                       max_build_bytes=args.build_memory_mb << 20)
+    if args.opening_book:
+        first_guess: str = args.first_guess if args.first_guess is not None else get_best_first_guess(pattern_matrix)
+        max_depth: int = args.max_depth if args.max_depth is not None else OPENING_BOOK_DEPTH
+    else:
+        first_guess: str = args.first_guess if args.first_guess is not None else "salet"
+        max_depth: int = args.max_depth if args.max_depth is not None else MAX_GUESS_N
+    if first_guess not in allowed_words:
+        raise SystemExit(f"{first_guess} is not an allowed {args.language} guess")
+
+    tree: StrategyTree = build_strategy_tree(pattern_matrix, first_guess, max_depth)
+    file_path: str = get_opening_book_file_path(pattern_matrix) if args.opening_book else \
+        get_strategy_file_path(pattern_matrix, first_guess)
+    tree.save(file_path)
+    print(f"saved {len(tree)} nodes to {file_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ from typing import Union
 
 
 @pytest.mark.parametrize("guess, letter_i, answer, expected", [
-    ("fiver", 0, "theft", False),  # not in answer, not yellow
+    ("fiver", 0, "there", False),  # not in answer, not yellow
     ("maker", 1, "trace", True),  # misplaced single occurence, yellow
     ("tratt", 4, "trace", False),  # letter is green in answer, not yellow
     ("sense", 3, "sunns", True),  # double occurence - one green, yellow
@@ -16,5 +16,566 @@ from typing import Union
 def test_char_is_yellow(guess: str,
                         letter_i: int,
                         answer: str,
-                        expected: bool) -> Union(AssertionError, bool):
+                        expected: bool) -> Union[AssertionError, bool]:
     assert char_is_yellow(guess, letter_i, answer) == expected
+
+
+# exact feedback agrees with the letter helpers, which are only right for grey off the greens
+
+FEEDBACK_WORDS: list = ["fiver", "there", "maker", "trace", "tratt", "sense", "sunns", "yukky", "kooky",
+                        "speed", "abide", "eerie", "tweet", "geese", "llama", "salet"]
+
+
+@pytest.mark.parametrize("guess", FEEDBACK_WORDS)
+def test_feedback_matches_letter_helpers(guess: str) -> Union[AssertionError, bool]:
+    from patterns import GREEN, GREY, YELLOW, decode_pattern, get_batch_feedback, get_feedback
+
+    batch_patterns: list = list(get_batch_feedback(guess, FEEDBACK_WORDS))
+    for answer, batch_pattern in zip(FEEDBACK_WORDS, batch_patterns):
+        pattern: int = get_feedback(guess, answer)
+        assert pattern == batch_pattern
+        for i, color in enumerate(decode_pattern(pattern, len(guess))):
+            assert (color == GREEN) == char_is_green(guess, i, answer)
+            assert (color == YELLOW) == char_is_yellow(guess, i, answer)
+            if color != GREEN:
+                assert (color == GREY) == char_is_grey(guess, i, answer)
+            if guess.count(guess[i]) == 1:
+                assert (color == YELLOW) == char_is_yellow_safe(guess, i, answer)
+
+
+# batched entropy scoring agrees with scoring one guess at a time
+
+SMALL_ANSWER_WORDS: list = ["cigar", "rebut", "sissy", "humph", "awake", "blush",
+                            "focal", "evade", "naval", "serve", "heath", "dwarf"]
+SMALL_ALLOWED_WORDS: list = SMALL_ANSWER_WORDS + ["salet", "crane", "tares", "yukky", "kooky"]
+
+
+def test_get_pattern_entropies_matches_scipy() -> Union[AssertionError, bool]:
+    from patterns import build_pattern_matrix, get_pattern_entropies
+    from scipy.stats import entropy
+    import numpy as np
+
+    matrix: np.ndarray = build_pattern_matrix(SMALL_ALLOWED_WORDS, SMALL_ANSWER_WORDS)
+    answer_ids: np.ndarray = np.array([0, 2, 3, 5, 8, 9, 11])
+    scores: np.ndarray = get_pattern_entropies(matrix, answer_ids, n_patterns=243)
+    for guess_id in range(len(SMALL_ALLOWED_WORDS)):
+        counts: np.ndarray = np.bincount(matrix[guess_id, answer_ids], minlength=243)
+        assert scores[guess_id] == pytest.approx(entropy(counts, base=2))
+
+
+def test_get_pattern_rejects_unknown_words() -> Union[AssertionError, bool]:
+    from patterns import PatternMatrix, get_feedback
+
+    pattern_matrix: PatternMatrix = PatternMatrix(SMALL_ALLOWED_WORDS, SMALL_ANSWER_WORDS, cache_folder_name=None)
+    assert pattern_matrix.get_pattern("salet", "cigar") == get_feedback("salet", "cigar")
+    for guess, answer in [("rhone", "cigar"), ("salet", "crane"), ("salet", "rhone")]:
+        with pytest.raises(KeyError):
+            pattern_matrix.get_pattern(guess, answer)
+
+
+@pytest.mark.parametrize("cache_folder_name", [None, "data"])
+def test_parallel_scoring_matches_serial(cache_folder_name: str, tmp_path,
+                                         monkeypatch) -> Union[AssertionError, bool]:
+    from parallel_scoring import ParallelScorer
+    from patterns import PatternMatrix, get_pattern_entropies
+    import numpy as np
+
+    monkeypatch.chdir(tmp_path)
+    pattern_matrix: PatternMatrix = PatternMatrix(SMALL_ALLOWED_WORDS, SMALL_ANSWER_WORDS,
+                                                  cache_folder_name=cache_folder_name)
+    answer_ids: np.ndarray = np.array([1, 4, 6, 7, 10])
+    guess_ids: np.ndarray = np.arange(len(SMALL_ALLOWED_WORDS))
+    scorer: ParallelScorer = ParallelScorer(pattern_matrix, n_workers=2)
+    # only a matrix built in memory is copied into shared memory
+    assert (scorer.shared_memory is None) == (cache_folder_name is not None)
+    try:
+        parallel_scores: np.ndarray = scorer.score(answer_ids, guess_ids)
+    finally:
+        scorer.close()
+    serial_scores: np.ndarray = get_pattern_entropies(pattern_matrix.matrix, answer_ids, guess_ids,
+                                                      pattern_matrix.n_patterns)
+    assert np.array_equal(parallel_scores, serial_scores)
+
+
+# bitset index lookups agree with plain string checks
+
+@pytest.mark.parametrize("letter", ["e", "k", "a", "s", "q"])
+def test_word_index_with_letter(letter: str) -> Union[AssertionError, bool]:
+    from word_index import WordIndex
+
+    index: WordIndex = WordIndex(SMALL_ALLOWED_WORDS)
+    expected: set = {w for w in SMALL_ALLOWED_WORDS if letter in w}
+    assert index.get_words(index.with_letter(letter)) == expected
+    assert index.get_words(index.get_bits(expected)) == expected
+
+
+def test_strategy_tree_solves_every_answer() -> Union[AssertionError, bool]:
+    from patterns import PatternMatrix
+    from strategy import StrategyTree, build_strategy_tree
+
+    pattern_matrix: PatternMatrix = PatternMatrix(SMALL_ALLOWED_WORDS, SMALL_ANSWER_WORDS,
+                                                  cache_folder_name=None)
+    tree: StrategyTree = build_strategy_tree(pattern_matrix, "salet")
+    assert tree.get_guess([]) == "salet"
+    for answer in SMALL_ANSWER_WORDS:
+        guess_patterns: list = []
+        guess: str = tree.get_guess(guess_patterns)
+        while guess != answer:
+            guess_patterns.append((guess, pattern_matrix.get_pattern(guess, answer)))
+            guess: str = tree.get_guess(guess_patterns)
+            assert guess is not None and len(guess_patterns) < 6
+
+
+def test_guess_cache_evicts_least_recently_used() -> Union[AssertionError, bool]:
+    from solver import GuessCache
+
+    cache: GuessCache = GuessCache(max_size=2)
+    cache.put(("a",), ("crane", {}))
+    cache.put(("b",), ("salet", {}))
+    assert cache.get(("a",)) is not None
+    cache.put(("c",), ("tares", {}))
+    assert cache.get(("b",)) is None
+    assert cache.get(("c",)) is not None
+    assert (cache.hits, cache.misses, len(cache)) == (2, 1, 2)
+
+
+def test_incremental_histograms_match_fresh_scores() -> Union[AssertionError, bool]:
+    from patterns import PatternMatrix, get_pattern_entropies
+    from solver import WordleSolver
+    import numpy as np
+
+    pattern_matrix: PatternMatrix = PatternMatrix(SMALL_ALLOWED_WORDS, SMALL_ANSWER_WORDS,
+                                                  cache_folder_name=None)
+    solver: WordleSolver = WordleSolver(set(SMALL_ANSWER_WORDS), set(SMALL_ALLOWED_WORDS), 2, None, False,
+                                        pattern_matrix=pattern_matrix, use_cache=False)
+    # shrink by a few answers (histograms updated) and then by most of them (histograms rebuilt)
+    for answer_words in [SMALL_ANSWER_WORDS, SMALL_ANSWER_WORDS[:9], SMALL_ANSWER_WORDS[2:5]]:
+        solver._Wordle__update_solver_info(set(answer_words), set(SMALL_ALLOWED_WORDS[1:]), 2)
+        solver.get_optimal_guess(game_mode="answer_unknown")
+        expected: np.ndarray = get_pattern_entropies(pattern_matrix.matrix, solver.answer_ids,
+                                                     solver.guess_ids, pattern_matrix.n_patterns)
+        assert np.array_equal(solver.guess_scores, expected)
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("salet _y___ brond yyy__\n", (["salet", "brond"], ["_y___", "yyy__"])),
+    ('{"guesses": ["CRANE"], "colors": ["__y_g"]}', (["crane"], ["__y_g"])),
+    ("{}", ([], [])),
+])
+def test_batch_solver_parse_state(line: str, expected: tuple) -> Union[AssertionError, bool]:
+    from batch_solver import parse_state
+
+    assert parse_state(line) == expected
+
+
+def test_batch_solver_reports_bad_states(tmp_path, monkeypatch) -> Union[AssertionError, bool]:
+    from batch_solver import solve_stream
+    from io import StringIO
+    import json
+    from wordle import Wordle
+
+    monkeypatch.chdir(tmp_path)
+    game: Wordle = Wordle(answer_words=set(SMALL_ANSWER_WORDS), allowed_words=set(SMALL_ALLOWED_WORDS),
+                          show_output=False, save_solver_results=False)
+    output: StringIO = StringIO()
+    # the last state's rows contradict each other, which no answer word can satisfy
+    lines: list = ['{"guesses": [1], "colors": ["_____"]}', '{"guesses": "salet"}', "salet _y___ brond",
+                   "salet _____ cigar ggggg"]
+    assert solve_stream(game, lines, output, top_k=3) == len(lines)
+    assert all("error" in json.loads(result) for result in output.getvalue().splitlines())
+
+
+def test_solve_server_fails_only_bad_states(tmp_path, monkeypatch) -> Union[AssertionError, bool]:
+    import asyncio
+    from solve_client import SolveClient
+    from solve_server import SolveServer
+    import socket
+    from wordle import Wordle
+
+    monkeypatch.chdir(tmp_path)
+    game: Wordle = Wordle(answer_words=set(SMALL_ANSWER_WORDS), allowed_words=set(SMALL_ALLOWED_WORDS),
+                          show_output=False, save_solver_results=False)
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port: int = s.getsockname()[1]
+    server: SolveServer = SolveServer(game, port=port, batch_window=0.05)
+    # a malformed state only fails itself, the rest of its batch is still solved
+    results: list = server.solve_batch([(["salet"], [None], 3), (["salet"], ["_y___"], 3), ([], [], 3)])
+    assert "error" in results[0] and "guess" in results[1] and results[2]["guess"] == "salet"
+
+    def solve(guesses: list, colors: list) -> dict:
+        with SolveClient(port=port) as client:
+            return client.solve(guesses, colors, top_k=3)
+
+    async def solve_concurrently() -> list:
+        serving: asyncio.Task = asyncio.create_task(server.serve_forever())
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        while True:
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.close()
+                break
+            except OSError:
+                await asyncio.sleep(0.01)
+        states: list = [(["salet"], ["_y___"]), (["salet", "cigar"], ["_____", "ggggg"]), (["kooky"], ["rrrrr"])]
+        try:
+            return await asyncio.gather(*[loop.run_in_executor(None, solve, guesses, colors)
+                                          for guesses, colors in states])
+        finally:
+            serving.cancel()
+            await asyncio.gather(serving, return_exceptions=True)
+
+    good, contradictory, invalid = asyncio.run(solve_concurrently())
+    assert good == results[1] and "error" in contradictory and "error" in invalid
+
+
+def test_batch_pattern_entropies_match_each_set() -> Union[AssertionError, bool]:
+    from patterns import PatternMatrix, get_batch_pattern_entropies, get_pattern_entropies
+    import numpy as np
+
+    pattern_matrix: PatternMatrix = PatternMatrix(SMALL_ALLOWED_WORDS, SMALL_ANSWER_WORDS,
+                                                  cache_folder_name=None)
+    answer_id_sets: list = [np.arange(12), np.array([0, 3, 4]), np.array([7]), np.array([], dtype=np.intp)]
+    guess_ids: np.ndarray = np.array([1, 4, 9, 16])
+    scores: np.ndarray = get_batch_pattern_entropies(pattern_matrix.matrix, answer_id_sets, guess_ids,
+                                                     pattern_matrix.n_patterns)
+    for set_scores, answer_ids in zip(scores, answer_id_sets):
+        assert np.array_equal(set_scores, get_pattern_entropies(pattern_matrix.matrix, answer_ids, guess_ids,
+                                                                pattern_matrix.n_patterns))
+
+
+def test_word_dictionary_round_trip() -> Union[AssertionError, bool]:
+    from word_dictionary import WordDictionary, WordSubset
+
+    dictionary: WordDictionary = WordDictionary(SMALL_ALLOWED_WORDS + ["", "éclat"])
+    assert list(dictionary) == sorted(set(SMALL_ALLOWED_WORDS + ["éclat"]))
+    assert dictionary.codes.dtype.name == "uint8"
+    assert dictionary[dictionary.get_id("éclat")] == "éclat" and dictionary.get_id("zzzzz") == -1
+    answers: WordSubset = dictionary.get_subset(SMALL_ANSWER_WORDS)
+    assert answers.copy() is answers and answers.issubset(dictionary.all_words)
+    remaining: WordSubset = answers - {"cigar", "zzzzz"}
+    assert set(remaining) == set(SMALL_ANSWER_WORDS) - {"cigar"}
+    assert "cigar" not in remaining and "rebut" in remaining
+
+
+# cold start: importing the game must stay cheap
+
+IMPORT_TIME_BUDGET: float = 0.75
+
+
+def test_import_time_budget() -> Union[AssertionError, bool]:
+    import subprocess
+    import sys
+
+    code: str = ("import sys, time\n"
+                 "start = time.perf_counter()\n"
+                 "import wordle_sim_stats, batch_solver\n"
+                 "print(time.perf_counter() - start)\n"
+                 "print(sorted({'pandas', 'scipy', 'tqdm'} & set(sys.modules)))\n")
+    output: list = subprocess.run([sys.executable, "-c", code], cwd=path.dirname(path.abspath(__file__)),
+                                  capture_output=True, text=True, check=True).stdout.splitlines()
+    assert output[1] == "[]"
+    assert float(output[0]) < IMPORT_TIME_BUDGET
+
+
+def test_word_cache_follows_source_changes(tmp_path) -> Union[AssertionError, bool]:
+    import os
+    from word_dictionary import WordDictionary, get_word_cache_file_path, load_word_dictionary
+
+    file_path: str = str(tmp_path / "xx_answer_words.txt")
+    with open(file_path, "w") as f:
+        f.write("cigar\nrebut\nhumph\nsalet\n")
+    assert list(load_word_dictionary(file_path, 5)) == ["cigar", "humph", "rebut", "salet"]
+    assert path.isfile(get_word_cache_file_path(file_path, 5))
+    assert list(load_word_dictionary(file_path, 5)) == ["cigar", "humph", "rebut", "salet"]
+
+    with open(file_path, "w") as f:
+        f.write("cigar\nrebut\nhumph\nsissy\n")
+    # same size as before, so only the (coarse on some file systems) mtime gives the edit away
+    os.utime(file_path, ns=(0, 10 ** 9))
+    dictionary: WordDictionary = load_word_dictionary(file_path, 5)
+    assert list(dictionary) == ["cigar", "humph", "rebut", "sissy"]
+
+
+def test_benchmark_regressions() -> Union[AssertionError, bool]:
+    from benchmarks import get_regressions
+
+    baseline: dict = {"results": {"en": {"fast": {"min": 1.0}, "slow": {"min": 1.0}, "broken": {"min": 1.0}}}}
+    results: dict = {"results": {"en": {"fast": {"min": 1.1}, "slow": {"min": 1.5}, "broken": {"error": "KeyError"},
+                                        "new": {"min": 9.0}}}}
+    regressions: list = get_regressions(results, baseline, tolerance=0.25)
+    assert [regression.split(":")[0] for regression in regressions] == ["en slow", "en broken"]
+
+
+def test_metrics_record_solver_moves() -> Union[AssertionError, bool]:
+    from metrics import MetricsCollector, disable_metrics, enable_metrics, get_metrics
+    from patterns import PatternMatrix
+    from solver import WordleSolver
+
+    pattern_matrix: PatternMatrix = PatternMatrix(SMALL_ALLOWED_WORDS, SMALL_ANSWER_WORDS,
+                                                  cache_folder_name=None)
+    solver: WordleSolver = WordleSolver(set(SMALL_ANSWER_WORDS), set(SMALL_ALLOWED_WORDS), 2, None, False,
+                                        pattern_matrix=pattern_matrix, use_cache=False)
+    metrics: MetricsCollector = enable_metrics()
+    try:
+        solver.get_optimal_guess(game_mode="answer_unknown")
+    finally:
+        assert disable_metrics() is metrics and get_metrics() is None
+    solver.get_optimal_guess(game_mode="answer_unknown")
+
+    report: dict = metrics.get_report()
+    assert report["timings"]["score_guesses"]["calls"] == 1
+    assert report["moves"] == [{"guess_n": 2, "n_answers": 12, "n_allowed": 17, "source": "scored",
+                                "seconds": report["moves"][0]["seconds"]}]
+    prometheus_text: str = metrics.get_prometheus_text()
+    assert 'wordle_hot_path_calls_total{path="score_guesses"} 1' in prometheus_text
+    # every sample belongs to the family declared above it, summaries only holding _count and _sum
+    family, family_type = None, None
+    for line in prometheus_text.splitlines():
+        if line.startswith("# TYPE "):
+            family, family_type = line.split()[2:4]
+        else:
+            name: str = line.split("{")[0]
+            assert name == family or (family_type == "summary" and name in (family + "_count", family + "_sum"))
+
+
+def test_pattern_matrix_build_resumes(tmp_path, monkeypatch) -> Union[AssertionError, bool]:
+    from patterns import PROGRESS_FILE_SUFFIX, PatternMatrix, build_pattern_matrix, get_pattern_dtype
+    import numpy as np
+    from os import listdir
+
+    monkeypatch.chdir(tmp_path)
+    expected: np.ndarray = build_pattern_matrix(sorted(SMALL_ALLOWED_WORDS), sorted(SMALL_ANSWER_WORDS))
+    # an interrupted build that got through 5 rows, marked so they can't have been recomputed
+    key: str = PatternMatrix(SMALL_ALLOWED_WORDS, SMALL_ANSWER_WORDS, cache_folder_name=None).key
+    (tmp_path / "cache").mkdir()
+    partial: np.ndarray = np.lib.format.open_memmap(str(tmp_path / "cache" / f"pattern_matrix_{key}.partial.npy"),
+                                                    mode="w+", dtype=get_pattern_dtype(5), shape=expected.shape)
+    partial[:5] = 1
+    partial.flush()
+    del partial
+    (tmp_path / "cache" / f"pattern_matrix_{key}{PROGRESS_FILE_SUFFIX}").write_text("5")
+
+    pattern_matrix: PatternMatrix = PatternMatrix(SMALL_ALLOWED_WORDS, SMALL_ANSWER_WORDS,
+                                                  cache_folder_name="cache", max_build_bytes=1)
+    assert (pattern_matrix.matrix[:5] == 1).all()
+    assert np.array_equal(pattern_matrix.matrix[5:], expected[5:])
+    assert listdir(tmp_path / "cache") == [f"pattern_matrix_{key}.npy"]
+
+
+def test_lookahead_respects_deadline() -> Union[AssertionError, bool]:
+    from patterns import PatternMatrix
+    from solver import WordleSolver
+
+    pattern_matrix: PatternMatrix = PatternMatrix(SMALL_ALLOWED_WORDS, SMALL_ANSWER_WORDS,
+                                                  cache_folder_name=None)
+    guesses: dict = dict()
+    for lookahead_seconds in [0.0, 60.0]:
+        solver: WordleSolver = WordleSolver(set(SMALL_ANSWER_WORDS), set(SMALL_ALLOWED_WORDS), 2, None, False,
+                                            pattern_matrix=pattern_matrix, use_cache=False, use_opening_book=False,
+                                            lookahead_top_k=5, lookahead_seconds=lookahead_seconds)
+        guesses[lookahead_seconds] = solver.get_optimal_guess(game_mode="answer_unknown")
+        assert solver.guess_source == "lookahead"
+    # out of time before any guess was rescored: the single step pick
+    greedy: WordleSolver = WordleSolver(set(SMALL_ANSWER_WORDS), set(SMALL_ALLOWED_WORDS), 2, None, False,
+                                        pattern_matrix=pattern_matrix, use_cache=False, use_opening_book=False)
+    assert guesses[0.0] == greedy.get_optimal_guess(game_mode="answer_unknown")
+    assert len(solver.lookahead_scores) == 5
+    assert guesses[60.0] == next(iter(solver.lookahead_scores))
+
+
+def test_result_store_migrates_pickle(tmp_path) -> Union[AssertionError, bool]:
+    from result_store import ResultStore
+    import pickle
+
+    with open(tmp_path / "results.pickle", "wb") as f:
+        pickle.dump({"cigar": ["salet", "cigar"], "rebut": ["salet", "brute", "rebut"]}, f)
+    store: ResultStore = ResultStore(str(tmp_path / "results.sqlite3"), commit_batch_size=4)
+    assert (tmp_path / "results.pickle").exists()
+    assert store.get_guesses("rebut") == ["salet", "brute", "rebut"]
+    # rows already saved win, new ones are visible before and after their batch commits
+    store.add_guesses("cigar", ["crane", "cigar", "cigar"])
+    assert store.get_guesses("cigar") == ["salet", "cigar", "cigar"]
+    store.add_guesses("sissy", ["salet", "sissy"])
+    assert len(store.pending) == 0
+    store.close()
+    assert ResultStore(str(tmp_path / "results.sqlite3")).get_guesses("sissy") == ["salet", "sissy"]
+    # another dictionary's store only imports the legacy games it could have played
+    other_store: ResultStore = ResultStore(str(tmp_path / "other.sqlite3"),
+                                           legacy_pickle_path=str(tmp_path / "results.pickle"),
+                                           allowed_words=set(SMALL_ALLOWED_WORDS))
+    assert other_store.get_guesses("cigar") == ["salet", "cigar"]
+    assert other_store.get_guesses("rebut") == []
+
+
+def test_partition_simulation_matches_games(tmp_path, monkeypatch) -> Union[AssertionError, bool]:
+    from wordle_sim_stats import SimulateGameStats, Wordle
+
+    monkeypatch.chdir(tmp_path)
+    game: Wordle = Wordle(answer_words=set(SMALL_ANSWER_WORDS), allowed_words=set(SMALL_ALLOWED_WORDS),
+                          show_output=False, is_automated=True, use_hints=False, save_solver_results=False)
+    game.excluded_answers = {"humph", "naval"}
+    by_partition: SimulateGameStats = SimulateGameStats(game)
+    by_partition.simulate_all_games_by_partition()
+    game.excluded_answers = {"humph", "naval"}
+    by_game: SimulateGameStats = SimulateGameStats(game)
+    by_game.simulate_all_games(show_progress=False)
+    assert list(by_partition.game_guesses.items()) == list(by_game.game_guesses.items())
+    assert (by_partition.guess_counts, by_partition.wins, by_partition.losses, by_partition.avg_n_guesses) == \
+        (by_game.guess_counts, by_game.wins, by_game.losses, by_game.avg_n_guesses)
+    game.excluded_answers = {"humph", "naval"}
+    by_workers: SimulateGameStats = SimulateGameStats(game)
+    by_workers.simulate_all_games(n_workers=2, show_progress=False)
+    assert list(by_workers.game_guesses.items()) == list(by_game.game_guesses.items())
+    assert game.excluded_answers == set(SMALL_ANSWER_WORDS)
+
+
+def test_parallel_simulation_saves_results(tmp_path, monkeypatch) -> Union[AssertionError, bool]:
+    from wordle_sim_stats import SimulateGameStats, Wordle
+    from result_store import ResultStore
+
+    monkeypatch.chdir(tmp_path)
+    game: Wordle = Wordle(answer_words=set(SMALL_ANSWER_WORDS), allowed_words=set(SMALL_ALLOWED_WORDS),
+                          show_output=False, is_automated=True, use_hints=False)
+    sim: SimulateGameStats = SimulateGameStats(game)
+    sim.simulate_all_games(n_workers=2, show_progress=False)
+    store_files: list = list(tmp_path.rglob("*.sqlite3"))
+    assert len(store_files) == 1
+    store: ResultStore = ResultStore(str(store_files[0]))
+    assert {answer: store.get_guesses(answer) for answer in sim.game_guesses} == sim.game_guesses
+
+
+def test_game_answers_match_feedback_across_resets(tmp_path, monkeypatch) -> Union[AssertionError, bool]:
+    from patterns import get_feedback
+    from wordle import Wordle
+
+    monkeypatch.chdir(tmp_path)
+    game: Wordle = Wordle(answer_words=set(FEEDBACK_WORDS), allowed_words=set(FEEDBACK_WORDS),
+                          show_output=False, is_automated=True, use_hints=False, save_solver_results=False)
+    for answer in ["geese", "sunns", "kooky"]:
+        game.play_answer(answer)
+        assert sorted(game.answer_words) == \
+            sorted(word for word in FEEDBACK_WORDS
+                   if all(get_feedback(guess, word) == get_feedback(guess, answer) for guess in game.used_guesses))
+        game.reset()
+        assert len(game.answer_words) == len(FEEDBACK_WORDS) and game.guess_patterns == []
+    assert game.excluded_answers == {"geese", "sunns", "kooky"}
+    assert len(game._Wordle__get_usable_answers()) == len(FEEDBACK_WORDS) - 3
+    # swapping one exclusion for another keeps the size but still changes the usable answers
+    game.excluded_answers = {"geese"}
+    game.exclude_answers(["sunns"])
+    game.excluded_answers = game.excluded_answers - {"geese"}
+    assert "geese" in game._Wordle__get_usable_answers() and "sunns" not in game._Wordle__get_usable_answers()
+    with pytest.raises(AttributeError):
+        game.excluded_answers.add("kooky")
+
+
+def test_opener_sweep_resumes_from_checkpoint(tmp_path, monkeypatch) -> Union[AssertionError, bool]:
+    import opener_sweep
+    from wordle_sim_stats import SimulateGameStats, Wordle
+
+    monkeypatch.chdir(tmp_path)
+    game: Wordle = Wordle(answer_words=set(SMALL_ANSWER_WORDS), allowed_words=set(SMALL_ALLOWED_WORDS),
+                          show_output=False, is_automated=True, use_hints=False, save_solver_results=False)
+    checkpoint_file_path: str = str(tmp_path / "sweep.jsonl")
+    leaderboard: list = opener_sweep.sweep_openers(game, ["crane", "kooky"], checkpoint_file_path,
+                                                   show_progress=False)
+    assert [record["avg_n_guesses"] for record in leaderboard] == \
+        sorted(record["avg_n_guesses"] for record in leaderboard)
+    by_game: SimulateGameStats = SimulateGameStats(Wordle(
+        answer_words=set(SMALL_ANSWER_WORDS), allowed_words=set(SMALL_ALLOWED_WORDS), show_output=False,
+        is_automated=True, use_hints=False, save_solver_results=False, first_guess="kooky"))
+    by_game.simulate_all_games(show_progress=False)
+    assert opener_sweep.read_checkpoint(checkpoint_file_path)["kooky"]["guess_counts"] == by_game.guess_counts
+
+    # a crash mid-write leaves a partial line, and finished openers aren't played again
+    with open(checkpoint_file_path, "a") as f:
+        f.write('{"opener": "sal')
+    swept: list = []
+    simulate_opener = opener_sweep.simulate_opener
+    monkeypatch.setattr(opener_sweep, "simulate_opener",
+                        lambda game, opener: swept.append(opener) or simulate_opener(game, opener))
+    leaderboard: list = opener_sweep.sweep_openers(game, ["kooky", "salet", "crane"], checkpoint_file_path,
+                                                   show_progress=False)
+    assert swept == ["salet"]
+    assert sorted(record["opener"] for record in leaderboard) == ["crane", "kooky", "salet"]
+    assert len(opener_sweep.read_checkpoint(checkpoint_file_path)) == 3
+
+
+def test_letter_stats_count_every_letter() -> Union[AssertionError, bool]:
+    from miscellaneous import get_letter_stats_df
+
+    words: list = ["abcde", "aaxyz", "éclat"]
+    df = get_letter_stats_df(words)
+    for letter in set("".join(words)) | {"q"}:
+        assert df.loc[letter, "total_count"] == sum(w.count(letter) for w in words)
+        for i in range(5):
+            assert df.loc[letter, f"idx_{i}_count"] == sum(w[i] == letter for w in words)
+            assert df.loc[letter, f"idx_{i}_rel_freq"] == pytest.approx(sum(w[i] == letter for w in words) / 3)
+    assert df["total_rel_freq"].sum() == pytest.approx(1)
+
+
+def test_prefilter_scores_only_top_guesses() -> Union[AssertionError, bool]:
+    from patterns import PatternMatrix
+    from solver import WordleSolver
+
+    pattern_matrix: PatternMatrix = PatternMatrix(SMALL_ALLOWED_WORDS, SMALL_ANSWER_WORDS,
+                                                  cache_folder_name=None)
+    answer_words: set = {"cigar", "focal", "naval", "heath"}
+    solver: WordleSolver = WordleSolver(answer_words, set(SMALL_ALLOWED_WORDS), 2, None, False,
+                                        pattern_matrix=pattern_matrix, use_cache=False, use_opening_book=False,
+                                        prefilter_top_m=3)
+    guess: str = solver.get_optimal_guess(game_mode="answer_unknown")
+    scored_words: set = set(solver.words_scores)
+    # the candidate answers are always scored on top of the best covering guesses
+    assert answer_words.issubset(scored_words) and len(scored_words) <= 3 + len(answer_words)
+    assert guess in scored_words
+
+
+def test_sampled_scoring_keeps_the_best_guess() -> Union[AssertionError, bool]:
+    from patterns import PatternMatrix, get_pattern_entropies, get_sampled_survivor_positions
+    from solver import WordleSolver
+    import numpy as np
+
+    words: list = sorted(set(SMALL_ALLOWED_WORDS + FEEDBACK_WORDS))
+    pattern_matrix: PatternMatrix = PatternMatrix(words, words, cache_folder_name=None)
+    answer_ids: np.ndarray = np.arange(len(words))
+    guess_ids: np.ndarray = np.arange(len(words))
+    runs: list = [get_sampled_survivor_positions(pattern_matrix.matrix, answer_ids, guess_ids,
+                                                 pattern_matrix.n_patterns, 4, np.random.default_rng(7), 3.0)
+                  for _ in range(2)]
+    # the same seed draws the same samples
+    assert np.array_equal(runs[0][0], runs[1][0]) and np.array_equal(runs[0][1], runs[1][1])
+    exact: np.ndarray = get_pattern_entropies(pattern_matrix.matrix, answer_ids, guess_ids, pattern_matrix.n_patterns)
+    assert np.argmax(exact) in runs[0][0]
+
+    guesses: list = [WordleSolver(set(words), set(words), 2, None, False, pattern_matrix=pattern_matrix,
+                                  use_cache=False, use_opening_book=False, sample_size=sample_size,
+                                  sample_seed=7).get_optimal_guess(game_mode="answer_unknown")
+                     for sample_size in [0, 4]]
+    assert guesses[0] == guesses[1]
+
+
+def test_multi_board_scores_every_board_in_one_pass(tmp_path, monkeypatch) -> Union[AssertionError, bool]:
+    from patterns import get_pattern_entropies
+    from wordle_sim_stats import MultiBoardWordle, SimulateMultiBoardStats
+    import numpy as np
+
+    monkeypatch.chdir(tmp_path)
+    game: MultiBoardWordle = MultiBoardWordle(answer_words=set(SMALL_ANSWER_WORDS),
+                                              allowed_words=set(SMALL_ALLOWED_WORDS), n_boards=2, show_output=False)
+    board_answer_ids: list = [np.array([0, 2, 5, 9]), np.array([1, 3, 4, 6, 7])]
+    game.solver.get_optimal_guess(board_answer_ids)
+    assert np.allclose(game.solver.guess_scores,
+                       sum(get_pattern_entropies(game.pattern_matrix.matrix, answer_ids, game.solver.guess_ids,
+                                                 game.pattern_matrix.n_patterns)
+                           for answer_ids in board_answer_ids))
+    game.play_answers(["cigar", "naval"])
+    assert game.is_solved and {"cigar", "naval"}.issubset(game.used_guesses)
+    assert len(game.used_guesses) == max(game.solved_guess_ns) <= game.max_guess_n
+
+    runs: list = [SimulateMultiBoardStats(game) for _ in range(2)]
+    for stats in runs:
+        stats.simulate_games(6, seed=3, show_progress=False)
+    assert runs[0].game_guesses == runs[1].game_guesses
+    assert runs[0].wins + runs[0].losses == 6 and sum(runs[0].guess_counts.values()) == 6
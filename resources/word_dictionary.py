@@ -0,0 +1,257 @@
+from collections.abc import Sequence
+from hashlib import sha1
+import numpy as np
+from os import makedirs, path, replace, stat
+
+WORD_CACHE_FILE_PREFIX: str = "word_cache_"
+WORD_CACHE_ARRAYS: tuple = ("code_points", "codes", "source_stat", "sha1")
+
+_loaded_dictionaries: dict = dict()
+_dictionary_keys: dict = dict()
+
+
+class WordDictionary(Sequence):
+    """Sorted word list of one length, stored as a contiguous (n_words, word_length) uint8 array
+
+    Each letter is a code into the dictionary's own alphabet, the sorted set of characters of its
+    words, so accented word lists need no special casing. Words are also packed into one integer
+    each, in the same order as the words, so a word's id is found with a binary search instead of
+    a dict of strings.
+    """
+
+    def __init__(self, words) -> None:
+        words: list = sorted({w for w in words if w != ""})
+        if len(words) == 0:
+            raise ValueError("a dictionary needs at least one word")
+        self.word_length: int = len(words[0])
+        if any(len(w) != self.word_length for w in words):
+            raise ValueError("every word of a dictionary must have the same length")
+        self.alphabet: str = "".join(sorted(set("".join(words))))
+        # code point of every letter code, for decoding ids back into strings
+        self.code_points: np.ndarray = np.array([ord(letter) for letter in self.alphabet], dtype=np.uint32)
+        self.__set_codes(self.encode(words))
+
+    @classmethod
+    def from_codes(cls, code_points: np.ndarray, codes: np.ndarray) -> "WordDictionary":
+        """rebuild a dictionary from its alphabet's code points and its sorted letter codes"""
+        dictionary: WordDictionary = cls.__new__(cls)
+        dictionary.word_length = codes.shape[1]
+        dictionary.alphabet = code_points.astype(np.uint32).tobytes().decode("utf-32-le")
+        dictionary.code_points = code_points.astype(np.uint32)
+        dictionary.__set_codes(codes.astype(np.uint8))
+        return dictionary
+
+    def __set_codes(self, codes: np.ndarray) -> None:
+        if len(self.alphabet) > np.iinfo(np.uint8).max + 1 or len(self.alphabet) ** self.word_length >= 1 << 63:
+            raise ValueError("the alphabet is too large to pack a word into one integer")
+        self.codes: np.ndarray = codes
+        self.packed: np.ndarray = self.__pack(self.codes)
+        self.key: str = sha1(self.alphabet.encode("utf-8") + self.codes.tobytes()).hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, word_id: int) -> str:
+        return self.code_points[self.codes[word_id]].tobytes().decode("utf-32-le")
+
+    def __iter__(self):
+        text: str = self.code_points[self.codes].tobytes().decode("utf-32-le")
+        for start in range(0, len(text), self.word_length):
+            yield text[start:start + self.word_length]
+
+    def __contains__(self, word: str) -> bool:
+        return self.get_id(word) >= 0
+
+    def encode(self, words: list) -> np.ndarray:
+        """letter codes of words spelled with this dictionary's alphabet"""
+        words: list = list(words)
+        code_points: np.ndarray = np.frombuffer("".join(words).encode("utf-32-le"), dtype=np.uint32)
+        return np.searchsorted(self.code_points, code_points).astype(np.uint8).reshape(len(words), self.word_length)
+
+    def __pack(self, codes: np.ndarray) -> np.ndarray:
+        packed: np.ndarray = np.zeros(len(codes), dtype=np.int64)
+        for i in range(self.word_length):
+            packed = packed * len(self.alphabet) + codes[:, i]
+        return packed
+
+    def get_id(self, word: str) -> int:
+        """the word's id, or -1 if it isn't in the dictionary"""
+        if len(word) != self.word_length or any(letter not in self.alphabet for letter in word):
+            return -1
+        key: int = int(self.__pack(self.encode([word]))[0])
+        word_id: int = int(np.searchsorted(self.packed, key))
+        return word_id if word_id < len(self.packed) and self.packed[word_id] == key else -1
+
+    def get_ids(self, words, skip_missing: bool = False) -> np.ndarray:
+        """ascending ids of a collection of words
+
+        Keyword arguments:
+        - words: the words to look up
+        - skip_missing: leave out words that aren't in the dictionary instead of raising KeyError
+        """
+        if isinstance(words, WordSubset) and words.dictionary.key == self.key:
+            return words.ids
+        all_words: list = list(words)
+        words: list = [w for w in all_words if len(w) == self.word_length]
+        if not skip_missing and len(words) < len(all_words):
+            raise KeyError("some words aren't in the dictionary")
+        if len(words) == 0:
+            return np.empty(0, dtype=np.intp)
+        code_points: np.ndarray = np.frombuffer("".join(words).encode("utf-32-le"), dtype=np.uint32)
+        letter_codes: np.ndarray = np.minimum(np.searchsorted(self.code_points, code_points), len(self.alphabet) - 1)
+        is_known: np.ndarray = (self.code_points[letter_codes] == code_points).reshape(len(words), self.word_length)
+        keys: np.ndarray = self.__pack(letter_codes.astype(np.uint8).reshape(len(words), self.word_length))
+        word_ids: np.ndarray = np.minimum(np.searchsorted(self.packed, keys), len(self.packed) - 1)
+        is_found: np.ndarray = is_known.all(axis=1) & (self.packed[word_ids] == keys)
+        if not skip_missing and not is_found.all():
+            raise KeyError("some words aren't in the dictionary")
+        return np.unique(word_ids[is_found]).astype(np.intp)
+
+    @property
+    def all_words(self) -> "WordSubset":
+        return WordSubset(self, np.arange(len(self), dtype=np.intp))
+
+    def get_subset(self, words) -> "WordSubset":
+        """subset of the dictionary holding a collection of its words"""
+        return WordSubset(self, self.get_ids(words))
+
+
+class WordSubset(Sequence):
+    """Immutable subset of a WordDictionary held as ascending word ids
+
+    It behaves like a read-only sorted collection of strings, but it's passed around
+    and "copied" without touching any strings.
+    """
+    __slots__ = ("dictionary", "ids")
+
+    def __init__(self, dictionary: WordDictionary, ids: np.ndarray) -> None:
+        self.dictionary: WordDictionary = dictionary
+        self.ids: np.ndarray = ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i: int) -> str:
+        return self.dictionary[self.ids[i]]
+
+    def __iter__(self):
+        text: str = self.dictionary.code_points[self.codes].tobytes().decode("utf-32-le")
+        for start in range(0, len(text), self.dictionary.word_length):
+            yield text[start:start + self.dictionary.word_length]
+
+    def __contains__(self, word: str) -> bool:
+        word_id: int = self.dictionary.get_id(word)
+        if word_id < 0:
+            return False
+        i: int = int(np.searchsorted(self.ids, word_id))
+        return i < len(self.ids) and self.ids[i] == word_id
+
+    def __sub__(self, words) -> "WordSubset":
+        """the subset without some words, which don't all need to be members"""
+        removed_ids: np.ndarray = self.dictionary.get_ids(words, skip_missing=True)
+        return WordSubset(self.dictionary, np.setdiff1d(self.ids, removed_ids, assume_unique=True))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, WordSubset):
+            return self.dictionary.key == other.dictionary.key and np.array_equal(self.ids, other.ids)
+        return set(self) == other
+
+    __hash__ = None
+
+    @property
+    def codes(self) -> np.ndarray:
+        return self.dictionary.codes[self.ids]
+
+    def copy(self) -> "WordSubset":
+        """subsets are immutable, so a copy is the subset itself"""
+        return self
+
+    def issubset(self, words) -> bool:
+        if isinstance(words, WordSubset) and words.dictionary.key == self.dictionary.key:
+            return bool(np.isin(self.ids, words.ids, assume_unique=True).all())
+        return set(self).issubset(words)
+
+
+def get_word_dictionary(words) -> WordDictionary:
+    """share one dictionary per word list across the whole process
+
+    Keyword arguments:
+    - words: a collection of words, a WordSubset covering its whole dictionary or a WordDictionary
+    """
+    if isinstance(words, WordSubset) and len(words) == len(words.dictionary):
+        words: WordDictionary = words.dictionary
+    if isinstance(words, WordDictionary):
+        return _loaded_dictionaries.setdefault(words.key, words)
+    word_set: frozenset = frozenset(w for w in words if w != "")
+    if word_set not in _dictionary_keys:
+        dictionary: WordDictionary = WordDictionary(word_set)
+        _loaded_dictionaries.setdefault(dictionary.key, dictionary)
+        _dictionary_keys[word_set] = dictionary.key
+    return _loaded_dictionaries[_dictionary_keys[word_set]]
+
+
+def get_word_cache_file_path(file_path: str, word_length: int) -> str:
+    folder_dir, file_name = path.split(file_path)
+    return path.join(folder_dir, f"{WORD_CACHE_FILE_PREFIX}{path.splitext(file_name)[0]}_{word_length}.bin")
+
+
+def load_word_dictionary(file_path: str, word_length: int) -> WordDictionary:
+    """the words of one length of a text word list, parsed once and then read from a binary cache
+
+    The cache is trusted while the text file's mtime and size are unchanged. Otherwise the
+    file is hashed, and it's only parsed again when its contents really changed.
+
+    Keyword arguments:
+    - file_path: text file with one word per line
+    - word_length: the game's word length
+    """
+    cache_file_path: str = get_word_cache_file_path(file_path, word_length)
+    source_stat = stat(file_path)
+    cache: dict = _read_word_cache(cache_file_path)
+    if cache is not None and (int(cache["source_stat"][0]) == source_stat.st_mtime_ns and
+                              int(cache["source_stat"][1]) == source_stat.st_size):
+        return get_word_dictionary(WordDictionary.from_codes(cache["code_points"], cache["codes"]))
+
+    with open(file_path, "rb") as f:
+        source: bytes = f.read()
+    digest: np.ndarray = np.frombuffer(sha1(source).digest(), dtype=np.uint8)
+    if cache is not None and np.array_equal(cache["sha1"], digest):
+        dictionary: WordDictionary = WordDictionary.from_codes(cache["code_points"], cache["codes"])
+    else:
+        # skip the blank entry left by the trailing newline
+        dictionary: WordDictionary = WordDictionary(w for w in source.decode("utf-8").split("\n")
+                                                    if len(w) == word_length)
+    _write_word_cache(cache_file_path, dictionary, source_stat, digest)
+    return get_word_dictionary(dictionary)
+
+
+def _read_word_cache(cache_file_path: str) -> dict:
+    """the cache is a few .npy arrays back to back, which avoids importing zipfile for an .npz"""
+    if not path.isfile(cache_file_path):
+        return None
+    try:
+        with open(cache_file_path, "rb") as f:
+            return {name: np.load(f) for name in WORD_CACHE_ARRAYS}
+    except Exception as e:
+        print(f"{cache_file_path} failed to load due to {e}")
+        return None
+
+
+def _write_word_cache(cache_file_path: str,
+                      dictionary: WordDictionary,
+                      source_stat,
+                      digest: np.ndarray) -> None:
+    """write to a temporary file first so readers never see a partial cache"""
+    arrays: dict = {"code_points": dictionary.code_points,
+                    "codes": dictionary.codes,
+                    "source_stat": np.array([source_stat.st_mtime_ns, source_stat.st_size], dtype=np.int64),
+                    "sha1": digest}
+    try:
+        makedirs(path.dirname(cache_file_path), exist_ok=True)
+        tmp_file_path: str = cache_file_path + ".tmp"
+        with open(tmp_file_path, "wb") as f:
+            for name in WORD_CACHE_ARRAYS:
+                np.save(f, arrays[name])
+        replace(tmp_file_path, cache_file_path)
+    except OSError as e:
+        print(f"Word list cache write unsuccessful due to {e}")
@@ -0,0 +1,60 @@
+import numpy as np
+from word_dictionary import WordDictionary, WordSubset, get_word_dictionary
+
+_loaded_indexes: dict = dict()
+
+
+class WordIndex:
+    """Inverted index from letters to bitsets of the word ids holding them
+
+    Bit i of every bitset stands for the i-th word in alphabetical order, so a
+    set of candidate words is a single int and dropping the words with a grey
+    letter is one ANDNOT.
+    """
+
+    def __init__(self, words) -> None:
+        self.words: WordDictionary = get_word_dictionary(words)
+        self.n_words: int = len(self.words)
+        self.all_bits: int = (1 << self.n_words) - 1
+        # letter -> words containing that letter
+        self.letter_bits: dict = dict()
+        self.__build()
+
+    def __build(self) -> None:
+        codes: np.ndarray = self.words.codes
+        for code, letter in enumerate(self.words.alphabet):
+            self.letter_bits[letter] = self.__mask_to_bits((codes == code).any(axis=1))
+
+    def __mask_to_bits(self, is_member: np.ndarray) -> int:
+        return int.from_bytes(np.packbits(is_member, bitorder="little").tobytes(), "little")
+
+    def __ids_to_bits(self, word_ids: list) -> int:
+        is_member: np.ndarray = np.zeros(self.n_words, dtype=bool)
+        is_member[word_ids] = True
+        return self.__mask_to_bits(is_member)
+
+    def get_bits(self, words) -> int:
+        """bitset of a collection of indexed words"""
+        return self.__ids_to_bits(self.words.get_ids(words))
+
+    def get_ids(self, bits: int) -> np.ndarray:
+        """ascending word ids of the members of a bitset"""
+        n_bytes: int = (self.n_words + 7) // 8
+        packed: np.ndarray = np.frombuffer(bits.to_bytes(n_bytes, "little"), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(packed, bitorder="little")[:self.n_words])
+
+    def get_words(self, bits: int) -> WordSubset:
+        """the members of a bitset as a subset of the dictionary, without decoding any strings"""
+        return WordSubset(self.words, self.get_ids(bits))
+
+    def with_letter(self, letter: str) -> int:
+        """words with at least one copy of letter"""
+        return self.letter_bits.get(letter, 0)
+
+
+def get_word_index(words) -> WordIndex:
+    """share one index per word list across the whole process"""
+    dictionary: WordDictionary = get_word_dictionary(words)
+    if dictionary.key not in _loaded_indexes:
+        _loaded_indexes[dictionary.key] = WordIndex(dictionary)
+    return _loaded_indexes[dictionary.key]
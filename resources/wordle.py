@@ -1,8 +1,15 @@
-from copy import deepcopy
+from collections import OrderedDict
 from colorama import Fore, Back, Style
+from metrics import observe, timed
 from miscellaneous import *
+import numpy as np
+from patterns import GREEN, YELLOW, PatternMatrix, decode_pattern, get_absent_letters, get_batch_feedback, \
+    get_feedback, get_pattern_from_colors, get_pattern_matrix
 import random
 from solver import WordleSolver
+from strategy import StrategyTree, get_strategy_file_path, load_strategy_tree
+from word_dictionary import WordDictionary, WordSubset, get_word_dictionary
+from word_index import WordIndex, get_word_index
 from wordle_exceptions import *
 
 
@@ -22,12 +29,6 @@ class Wordle:
                          " infers that the letter is not found in the answer.\n")
     OUTRO_LOSS_OUTPUT: str = "You lost. The answer was "
     OUTRO_WIN_OUTPUT: str = "You won!"
-    LETTER_COLOR_SCHEMA: dict = {
-        "grey_letters": set(),
-        "yellow_idx_letters": {0: [], 1: [], 2: [], 3: [], 4: []},
-        "grey_for_idx_letters": {0: [], 1: [], 2: [], 3: [], 4: []},
-        "green_idx_letter": {0: "", 1: "", 2: "", 3: "", 4: ""}
-    }
     ACTIVE_WORDLE_INTRO: str = ("Follow the prompts to find an optimal word for your active wordle.\n"
                                 "g = green, _ = grey, y = yellow, / = grey at index only\n")
     GAME_OVER_REMINDER: str = "GAME OVER: You must reset this Wordle variable to replay or solve an active Wordle"
@@ -37,26 +38,46 @@ class Wordle:
                  allowed_words: set,
                  show_output: bool = True,
                  is_automated: bool = False,
-                 use_hints: bool = True) -> None:
+                 use_hints: bool = True,
+                 n_scoring_workers: int = 1,
+                 save_solver_results: bool = True,
+                 lookahead_top_k: int = 0,
+                 lookahead_seconds: float = WordleSolver.LOOKAHEAD_SECONDS,
+                 first_guess: str = None,
+                 prefilter_top_m: int = 0,
+                 use_opening_book: bool = True,
+                 sample_size: int = 0,
+                 sample_seed: int = None) -> None:
         self.use_hints: bool = use_hints
+        self.save_solver_results: bool = save_solver_results
+        self.n_scoring_workers: int = n_scoring_workers
+        self.lookahead_top_k: int = lookahead_top_k
+        self.lookahead_seconds: float = lookahead_seconds
+        # opt-in: the solver's first guess instead of the opening book's or WordleSolver.OPTIMAL_FIRST_GUESS
+        self.first_guess: str = first_guess
+        self.prefilter_top_m: int = prefilter_top_m
+        self.use_opening_book: bool = use_opening_book
+        self.sample_size: int = sample_size
+        self.sample_seed: int = sample_seed
         self.original_answer_words: set = answer_words
         self.original_allowed_words: set = allowed_words
         self.answer_words: set = answer_words
         self.allowed_words: set = allowed_words
-        self.all_info: dict = deepcopy(Wordle.LETTER_COLOR_SCHEMA)
-        self.row_info: dict = deepcopy(Wordle.LETTER_COLOR_SCHEMA)
         self.solver: WordleSolver = None
         self.show_output: bool = show_output
         self.is_automated: bool = is_automated
         self.game_over: bool = False
         self.__game_in_session: bool = False
-        self.excluded_answers: set = set()
+        self.__excluded_answers: set = set()
+        # answers minus the excluded ones, None until it's worked out again
+        self.__usable_answers: WordSubset = None
 
-        self.answer: str = random.choice(tuple(answer_words))
         self.current_guess: str = ""
         self.current_letter_i: int = 0
         self.guess_n: int = 0
         self.used_guesses = []
+        # (guess, pattern code) of every row so far
+        self.guess_patterns = []
         self.drawn_squares = []
 
         if len(allowed_words) == 0 or len(answer_words) == 0:
@@ -65,24 +86,57 @@ class Wordle:
             raise InvalidSet(self, "subset larger than superset")
         elif not answer_words.issubset(allowed_words):
             raise InvalidSet(self, "subset not in superset")
+        # every word list of the game is an id subset of one shared dictionary, so resets and
+        # solvers share them instead of copying sets of strings
+        self.dictionary: WordDictionary = get_word_dictionary(allowed_words)
+        self.original_allowed_words: WordSubset = self.dictionary.all_words
+        self.original_answer_words: WordSubset = self.dictionary.get_subset(answer_words)
+        self.allowed_words: WordSubset = self.original_allowed_words
+        self.answer_words: WordSubset = self.original_answer_words
+        self.answer: str = random.choice(self.original_answer_words)
+        self.pattern_matrix: PatternMatrix = get_pattern_matrix(self.dictionary, self.original_answer_words)
+        self.__strategy_tree: StrategyTree = None
+        self.word_index: WordIndex = get_word_index(self.dictionary)
+        self.allowed_bits: int = self.word_index.all_bits
         self.__game_output(Wordle.INTRO_OUTPUT)
 
+    @property
+    def excluded_answers(self) -> frozenset:
+        """answers left out of random games, changed by assigning a set or with exclude_answers"""
+        return frozenset(self.__excluded_answers)
+
+    @excluded_answers.setter
+    def excluded_answers(self, answers: set) -> None:
+        self.__excluded_answers: set = set(answers)
+        self.__usable_answers: WordSubset = None
+
+    def exclude_answers(self, answers) -> None:
+        """leave more answers out of later random games"""
+        self.__excluded_answers.update(answers)
+        self.__usable_answers: WordSubset = None
+
+    def __get_usable_answers(self) -> WordSubset:
+        if self.__usable_answers is None:
+            self.__usable_answers: WordSubset = self.original_answer_words - self.__excluded_answers
+        return self.__usable_answers
+
     def reset(self) -> None:
         """Reset game attributes.
 
         Keyword arguments:
         - exclude_solutions -- set of answer words to exclude from the set of original possible answers
         """
-        self.answer_words: set = self.original_answer_words
-        self.allowed_words: set = self.original_allowed_words
-        usable_answers = self.original_answer_words - self.excluded_answers
+        self.answer_words: WordSubset = self.original_answer_words
+        self.allowed_words: WordSubset = self.original_allowed_words
+        self.allowed_bits: int = self.word_index.all_bits
+        usable_answers: WordSubset = self.__get_usable_answers()
         if len(usable_answers) == 0:  # no game can be created
             return
-        self.answer: str = random.choice(tuple(usable_answers))
+        self.answer: str = random.choice(usable_answers)
         self.current_guess: str = ""
         self.guess_n: int = 0
-        self.all_info: dict = deepcopy(Wordle.LETTER_COLOR_SCHEMA)
-        self.row_info: dict = deepcopy(Wordle.LETTER_COLOR_SCHEMA)
+        self.used_guesses.clear()
+        self.guess_patterns.clear()
         self.solver: WordleSolver = None
         self.game_over: bool = False
         self.__game_in_session: bool = False
@@ -95,6 +149,7 @@ class Wordle:
         colors: str = ""
         game_has_guesses: bool = False if n_guesses_so_far == 0 else True
         self.guess_n = 1
+        strategy_tree: StrategyTree = self.__get_strategy_tree()
 
         while 0 > n_guesses_so_far > Wordle.MAX_GUESS_N - 1:
             print(
@@ -104,6 +159,7 @@ class Wordle:
 
         if self.__game_in_session:
             self.reset()
+        self.guess_patterns.clear()
 
         self.__setup_solver(use_solver=True)
         while not self.game_over:
@@ -111,7 +167,7 @@ class Wordle:
                 if game_has_guesses:
                     if optimal_guess == "":  # no solutions generated so far, take user inputs
                         self.current_guess: str = input(
-                            f"guess n = {self.current_guess_n} word: ").lower()
+                            f"guess n = {self.guess_n} word: ").lower()
                         while not self.current_guess.isalpha() or len(self.current_guess) != Wordle.WORDLE_LENGTH:
                             self.current_guess: str = input(
                                 "your word can only contain five ascii letters, try again").lower()
@@ -123,20 +179,9 @@ class Wordle:
                         colors: str = input(f"your colors don't have five of the required symbols, recall that:\n" +
                                             "g = green, _ = grey, y = yellow, / = grey at index only\n").lower()
                     self.__color_active_guess(colors)
+                    self.guess_patterns.append((self.current_guess, get_pattern_from_colors(colors)))
 
-                for i, letter in enumerate(self.current_guess):
-                    if colors[i] == "_":
-                        self.row_info["grey_letters"].add(letter)
-                    elif colors[i] == "g":
-                        self.row_info["green_idx_letter"][i] = letter
-                    elif colors[i] == "y":
-                        self.row_info["yellow_idx_letters"][i].append(letter)
-                    elif colors[i] == "/":
-                        self.row_info["grey_for_idx_letters"][i].append(letter)
-                    else:
-                        raise ValueError(
-                            f"{colors[i]} isn't a valid color symbol, you must use '_', 'g', 'y', or '/'")
-                self.__update_after_guess()
+                self.__record_colors(colors)
                 self.guess_n += 1
 
                 if self.guess_n == Wordle.WORDLE_LENGTH - 1:
@@ -151,13 +196,100 @@ class Wordle:
                 print("Game Over!")
                 return
 
-            self.__update_solver(use_solver=True)
-            print("Calculating...", flush=True)
-            optimal_guess: str = self.solver.get_optimal_guess(
-                game_mode="answer_unknown")
+            optimal_guess: str = strategy_tree.get_guess(self.guess_patterns) if strategy_tree is not None else None
+            if optimal_guess is None:
+                self.__update_solver(use_solver=True)
+                print("Calculating...", flush=True)
+                optimal_guess: str = self.solver.get_optimal_guess(
+                    game_mode="answer_unknown")
             print(f"Try '{optimal_guess}' for your next guess", flush=True)
             game_has_guesses = True
 
+    def __get_strategy_tree(self) -> StrategyTree:
+        """the prebuilt guide mode strategy tree of this dictionary, if one was built"""
+        if self.__strategy_tree is None:
+            self.__strategy_tree: StrategyTree = load_strategy_tree(
+                self.pattern_matrix, get_strategy_file_path(self.pattern_matrix, WordleSolver.OPTIMAL_FIRST_GUESS))
+        return self.__strategy_tree
+
+    def __record_colors(self, colors: str) -> None:
+        """update the puzzle's known information with the colors of an external guess"""
+        for symbol in colors:
+            if symbol not in "_gy/":
+                raise ValueError(
+                    f"{symbol} isn't a valid color symbol, you must use '_', 'g', 'y', or '/'")
+        # no row has been played yet
+        if len(colors) == 0:
+            return
+        self.__record_pattern(get_pattern_from_colors(colors))
+
+    def __record_pattern(self, pattern: int) -> None:
+        """update the puzzle's known information with the feedback pattern of the current guess"""
+        with timed("update_word_sets"):
+            self.__update_word_sets(pattern)
+
+    def get_guide_suggestion(self, guesses: list, colors: list, top_n: int = 10) -> tuple:
+        """replay an external game's rows without any prompts and recommend the next guess
+
+        The solver is kept between calls so a long stream of states stays warm.
+
+        Keyword arguments:
+        - guesses: the words played so far
+        - colors: one color string per guess (g = green, _ = grey, y = yellow, / = grey at index only)
+        - top_n: number of top scores to report
+
+        Returns (next guess, number of remaining candidate answers, top scores)
+        """
+        self.set_guide_state(guesses, colors)
+        optimal_guess: str = self.get_unscored_guide_suggestion()
+        if optimal_guess is None:
+            optimal_guess: str = self.solver.get_scored_guess(game_mode="answer_unknown")
+        top_scores: OrderedDict = self.solver.get_top_n_word_scores(top_n) if len(self.solver.top_scores) > 0 \
+            else OrderedDict()
+        return optimal_guess, len(self.answer_words), top_scores
+
+    def set_guide_state(self, guesses: list, colors: list) -> None:
+        """validate and replay an external game's rows, leaving the solver on the resulting position
+
+        Keyword arguments:
+        - guesses: the words played so far
+        - colors: one color string per guess (g = green, _ = grey, y = yellow, / = grey at index only)
+        """
+        if len(guesses) != len(colors):
+            raise ValueError("every guess needs exactly one color string")
+        if len(guesses) >= Wordle.MAX_GUESS_N:
+            raise ValueError(f"no guesses are left after {Wordle.MAX_GUESS_N} rows")
+        for guess, row_colors in zip(guesses, colors):
+            if len(guess) != Wordle.WORDLE_LENGTH or guess not in self.original_allowed_words:
+                raise ValueError(f"{guess} is not an allowed guess")
+            if len(row_colors) != Wordle.WORDLE_LENGTH or not string_is_valid(string=row_colors,
+                                                                              must_have_chars=["g", "y", "/", "_"]):
+                raise ValueError(f"{row_colors} must be {Wordle.WORDLE_LENGTH} of the symbols g, y, / or _")
+
+        guide_solver: WordleSolver = self.solver
+        self.reset()
+        self.guess_n = 1
+        for guess, row_colors in zip(guesses, colors):
+            self.current_guess: str = guess
+            self.guess_patterns.append((guess, get_pattern_from_colors(row_colors)))
+            self.__record_colors(row_colors)
+            self.guess_n += 1
+
+        self.solver: WordleSolver = guide_solver
+        if self.solver is None:
+            self.__setup_solver(use_solver=True)
+        self.__update_solver(use_solver=True)
+
+    def get_unscored_guide_suggestion(self) -> str:
+        """the next guess for the position set by set_guide_state if it needs no scoring
+        (strategy tree, opening book or a cached position), otherwise None"""
+        strategy_tree: StrategyTree = self.__get_strategy_tree()
+        optimal_guess: str = strategy_tree.get_guess(self.guess_patterns) if strategy_tree is not None else None
+        if optimal_guess is not None:
+            self.solver.top_scores = OrderedDict()
+            return optimal_guess
+        return self.solver.get_unscored_guess(game_mode="answer_unknown")
+
     def play(self):
         """play a fresh game of Wordle"""
         self.__setup_solver()
@@ -172,21 +304,31 @@ class Wordle:
 
     def __setup_solver(self, use_solver: bool = False) -> None:
         if self.is_automated or use_solver:
-            self.solver: WordleSolver = WordleSolver(answer_words=self.answer_words.copy(),
-                                                     allowed_words=self.allowed_words.copy(),
+            self.solver: WordleSolver = WordleSolver(answer_words=self.answer_words,
+                                                     allowed_words=self.allowed_words,
                                                      guess_n=1,
                                                      game_answer=self.answer,
-                                                     show_output=self.show_output)
+                                                     show_output=self.show_output,
+                                                     pattern_matrix=self.pattern_matrix,
+                                                     n_workers=self.n_scoring_workers,
+                                                     lookahead_top_k=self.lookahead_top_k,
+                                                     lookahead_seconds=self.lookahead_seconds,
+                                                     first_guess=self.first_guess,
+                                                     prefilter_top_m=self.prefilter_top_m,
+                                                     use_opening_book=self.use_opening_book,
+                                                     sample_size=self.sample_size,
+                                                     sample_seed=self.sample_seed)
 
     def __update_solver(self, use_solver: bool = False) -> None:
         if self.is_automated or use_solver:
             self.solver.__update_solver_info(answer_words=self.answer_words,
                                              allowed_words=self.allowed_words,
-                                             guess_n=self.guess_n)
+                                             guess_n=self.guess_n,
+                                             guess_patterns=self.guess_patterns)
 
     def __save_solver_info(self, use_solver: bool = False) -> None:
-        if self.is_automated or use_solver:
-            self.solver.__write_dict_pickle()
+        if (self.is_automated or use_solver) and self.save_solver_results:
+            self.solver.__write_results()
 
     def play_and_drop_answer(self):
         """play a game of Wordle but remove the
@@ -200,7 +342,23 @@ class Wordle:
 
         self.__game_output(self.__get_game_outcome_output())
         self.__save_solver_info()
-        self.excluded_answers.add(self.answer)
+        self.__exclude_answer(self.answer)
+
+    def __exclude_answer(self, answer: str) -> None:
+        """drop one answer from later random games without working out the usable answers again"""
+        if answer in self.__excluded_answers:
+            return
+        self.__excluded_answers.add(answer)
+        if self.__usable_answers is not None:
+            self.__usable_answers: WordSubset = self.__usable_answers - [answer]
+
+    def play_answer(self, answer: str) -> None:
+        """play a game of Wordle against a chosen answer, leaving the
+           final game state in place until the next reset"""
+        if answer not in self.original_answer_words:
+            raise InvalidSet(self, "answer not in answer words")
+        self.answer: str = answer
+        self.play_and_drop_answer()
 
     def play_next_guess(self) -> None:
         """play the next row's guess"""
@@ -209,18 +367,27 @@ class Wordle:
             self.__update_solver()
             self.current_guess: str = self.solver.get_optimal_guess(
             ) if self.is_automated else self.__get_player_guess()
+            self.used_guesses.append(self.current_guess)
+            self.guess_patterns.append((self.current_guess, self.__get_answer_pattern(self.current_guess)))
             self.__process_guess()
-            if self.use_hints and self.current_guess != self.answer:
-                sample_answers: list = random.sample(self.answer_words, 10) if len(
-                    self.answer_words) >= 10 else list(self.answer_words)
-                if len(sample_answers) > 1:
-                    self.__game_output(f"hints: {', '.join(sample_answers)}")
-                else:
-                    self.__game_output(f"hint: {sample_answers[0]}")
+            if self.show_output and self.use_hints and self.current_guess != self.answer:
+                with timed("hint_sampling"):
+                    sample_answers: list = random.sample(self.answer_words, 10) if len(
+                        self.answer_words) >= 10 else list(self.answer_words)
+                    if len(sample_answers) > 1:
+                        self.__game_output(f"hints: {', '.join(sample_answers)}")
+                    else:
+                        self.__game_output(f"hint: {sample_answers[0]}")
 
         else:
             self.game_over = True
 
+    def __get_answer_pattern(self, guess: str) -> int:
+        """the answer's feedback for a guess, computed directly when the guess has no pattern matrix row"""
+        if self.dictionary.get_id(guess) < 0:
+            return get_feedback(guess, self.answer)
+        return self.pattern_matrix.get_pattern(guess, self.answer)
+
     def __game_output(self, output: str) -> None:
         """print various game outputs if output is enabled"""
         if self.show_output:
@@ -272,87 +439,49 @@ class Wordle:
 
     def __process_guess(self) -> None:
         """color the output and update the puzzle's known information"""
-        colored_output: str = ""
+        _, pattern = self.guess_patterns[-1]
+        if self.show_output:
+            self.__game_output(f"{self.guess_n}: {self.__get_colored_guess(pattern)}")
+        self.__record_pattern(pattern)
 
-        # compare the letters between answer and guess at each index to determine a label
-        for i in range(Wordle.WORDLE_LENGTH):
-            if char_is_green(self.current_guess, i, self.answer):
-                colored_output += f"{Fore.GREEN}{self.current_guess[i]}{Fore.RESET}"
-                self.row_info["green_idx_letter"][i] = self.current_guess[i]
-            elif char_is_yellow(self.current_guess, i, self.answer):
-                colored_output += f"{Fore.YELLOW}{self.current_guess[i]}{Fore.RESET}"
-                self.row_info["yellow_idx_letters"][i].append(
-                    self.current_guess[i])
-            elif char_is_grey(self.current_guess, i, self.answer):
-                colored_output += f"{Back.WHITE}{Fore.BLACK}{self.current_guess[i]}{Style.RESET_ALL}"
-                self.row_info["grey_letters"].add(self.current_guess[i])
-            elif char_is_grey_at_idx(self.current_guess, i, self.answer):
-                colored_output += f"{self.current_guess[i]}"
-                self.row_info["grey_for_idx_letters"][i].append(
-                    self.current_guess[i])
-            else:
-                raise UnclassifiedLetter(self, i)
-
-        self.__game_output(f"{self.guess_n}: {colored_output}")
-        self.__update_after_guess()
-
-    def __update_after_guess(self) -> None:
-        self.__update_word_sets()
-        for key, _ in self.all_info.items():
-            if key == "yellow_idx_letters" or key == "grey_for_idx_letters":
-                for i in self.all_info[key]:
-                    self.all_info[key][i] = self.all_info[key][i] + \
-                        self.row_info[key][i]
+    def __get_colored_guess(self, pattern: int) -> str:
+        colored_output: str = ""
+        for letter, color in zip(self.current_guess, decode_pattern(pattern, Wordle.WORDLE_LENGTH)):
+            if color == GREEN:
+                colored_output += f"{Fore.GREEN}{letter}{Fore.RESET}"
+            elif color == YELLOW:
+                colored_output += f"{Fore.YELLOW}{letter}{Fore.RESET}"
             else:
-                self.all_info[key].update(self.row_info[key])
-        self.row_info: dict = deepcopy(Wordle.LETTER_COLOR_SCHEMA)
+                colored_output += f"{Back.WHITE}{Fore.BLACK}{letter}{Style.RESET_ALL}"
+        return colored_output
 
-    def __update_word_sets(self) -> None:
-        """update each set to reflect the most up to date information"""
-        allowed_words_subset: set = set()
-        answer_words_subset: set = set()
+    def __update_word_sets(self, pattern: int) -> None:
+        """update each set to reflect the most up to date information
+
+        Keyword arguments:
+        - pattern: feedback pattern code of the current guess
+        """
+        index: WordIndex = self.word_index
+        row_grey_bits: int = 0
+        for grey_letter in get_absent_letters(self.current_guess, pattern):
+            row_grey_bits |= index.with_letter(grey_letter)
 
         # allowed words: drop all grey letters
         # - maintain a set of words that a user can use
-        for allowed_word in self.allowed_words:
-            for letter in allowed_word:
-                if letter in self.row_info["grey_letters"]:
-                    break
-            else:
-                allowed_words_subset.add(allowed_word)
+        self.allowed_bits: int = self.allowed_bits & ~row_grey_bits
+        self.allowed_words: WordSubset = index.get_words(self.allowed_bits)
 
-        # answer words: drop all words that don't reflect known info
+        # answer words: keep the words that would have given the guess the same feedback
         # - maintain a set of words that could possibly be the answer
-        for answer in self.answer_words:
-            for i, letter in enumerate(answer):
-                trimmed_answer: str = answer[:i] + answer[i +
-                                                          1:] if Wordle.WORDLE_LENGTH > i else answer[:i]
-                compatible_yellow: bool = True
-                for yellow_letter in self.row_info["yellow_idx_letters"][i]:
-                    if yellow_letter not in trimmed_answer:
-                        compatible_yellow: bool = False
-                grey_for_idx: bool = False
-                for grey_idx_letter in self.row_info["grey_for_idx_letters"][i]:
-                    if grey_idx_letter == answer[i]:
-                        grey_for_idx: bool = True
-                # omit words with grey letters
-                if letter in self.row_info["grey_letters"]:
-                    break
-                # omit words without known green letters in the right spot
-                elif self.row_info["green_idx_letter"][i] != "" and self.row_info["green_idx_letter"][i] != letter:
-                    break
-                # omit words with yellow letters that are absent
-                elif not compatible_yellow:
-                    break
-                # omit words with a letter at an index that is elsewhere correctly in the word
-                elif grey_for_idx:
-                    break
-            else:
-                # word matches all above conditions
-                answer_words_subset.add(answer)
-
-        self.allowed_words: set = allowed_words_subset
-        self.answer_words: set = answer_words_subset
+        answer_ids: np.ndarray = self.answer_words.ids
+        guess_id: int = self.dictionary.get_id(self.current_guess)
+        if guess_id >= 0:
+            patterns: np.ndarray = self.pattern_matrix.matrix[guess_id, self.pattern_matrix.answer_columns[answer_ids]]
+        else:
+            patterns: np.ndarray = get_batch_feedback(self.current_guess, self.answer_words)
+        self.answer_words: WordSubset = WordSubset(self.dictionary, answer_ids[patterns == pattern])
 
-        for length in [len(self.answer_words), len(self.allowed_words)]:
-            assert length > 0, "Your wordle game doesn't match up with the available answers and/or words provided"
+        observe("remaining_answers", len(self.answer_words))
+        observe("remaining_allowed", len(self.allowed_words))
+        if len(self.answer_words) == 0 or len(self.allowed_words) == 0:
+            raise ValueError("Your wordle game doesn't match up with the available answers and/or words provided")
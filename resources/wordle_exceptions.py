@@ -1,7 +1,6 @@
 def print_relevant_vars_attrs(object: object, keys: list):
-    attrs = vars(object)
     for key in keys:
-        print(f"{key}:{attrs[key]}")
+        print(f"{key}:{getattr(object, key)}")
 
 
 class GameOver(Exception):
@@ -14,7 +13,7 @@ class GameOver(Exception):
         else:
             print_relevant_vars_attrs(
                 wordle, keys=["answer", "guess", "guess_n", "game_over",
-                              "all_info"])
+                              "guess_patterns"])
 
 
 class UnclassifiedLetter(Exception):
@@ -23,7 +22,7 @@ class UnclassifiedLetter(Exception):
     def __init__(self, wordle: object, letter_i) -> None:
         print(
             f"letter situated at index {letter_i} was not able to be labeled")
-        print_relevant_vars_attrs(wordle, keys=["answer", "guess", "all_info"])
+        print_relevant_vars_attrs(wordle, keys=["answer", "guess", "guess_patterns"])
 
 
 class InvalidSet(Exception):
@@ -40,3 +39,5 @@ class InvalidSet(Exception):
             for word in wordle.answer_words:
                 if word not in wordle.allowed_words:
                     print(f"{word} is absent from allowed words")
+        elif condition == "answer not in answer words":
+            print("The chosen answer is not one of the answer words")
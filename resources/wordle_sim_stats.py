@@ -1,5 +1,49 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
+from result_store import _flush_open_stores
+from multi_board import MultiBoardWordle
 from wordle import *
-from tqdm import tqdm
+
+# game played by each simulation worker process, created once by the pool initializer
+_worker_game: Wordle = None
+
+
+def _setup_worker_game(answer_words: set,
+                       allowed_words: set,
+                       use_hints: bool,
+                       lookahead_top_k: int = 0,
+                       lookahead_seconds: float = WordleSolver.LOOKAHEAD_SECONDS,
+                       first_guess: str = None,
+                       prefilter_top_m: int = 0,
+                       use_opening_book: bool = True,
+                       sample_size: int = 0,
+                       sample_seed: int = None,
+                       save_solver_results: bool = False) -> None:
+    """pool initializer: build a silent automated game for this worker"""
+    global _worker_game
+    _worker_game = Wordle(answer_words=answer_words,
+                          allowed_words=allowed_words,
+                          show_output=False,
+                          is_automated=True,
+                          use_hints=use_hints,
+                          save_solver_results=save_solver_results,
+                          lookahead_top_k=lookahead_top_k,
+                          lookahead_seconds=lookahead_seconds,
+                          first_guess=first_guess,
+                          prefilter_top_m=prefilter_top_m,
+                          use_opening_book=use_opening_book,
+                          sample_size=sample_size,
+                          sample_seed=sample_seed)
+    # pool workers leave through os._exit, which skips atexit, so commit their buffered results on the way out
+    Finalize(None, _flush_open_stores, exitpriority=0)
+
+
+def _play_worker_game(answer: str) -> tuple:
+    """play one exact answer inside a worker and report (answer, guesses)"""
+    _worker_game.play_answer(answer)
+    guesses: list = list(_worker_game.used_guesses)
+    _worker_game.reset()
+    return answer, guesses
 
 
 class SimulateGameStats:
@@ -18,17 +62,216 @@ class SimulateGameStats:
         self.game_guesses: dict = dict()
         self.answer_entropy_guesses: dict = None
 
-    def simulate_all_games(self) -> None:
-        """Simulate all possible wordle games"""
-        n_games_possible = len(self.game.answer_words)
-        for _ in tqdm(range(n_games_possible), total=n_games_possible):
-            self.n_games += 1
-            self.game.play_and_drop_answer()
-            if self.game.guess == self.game.answer:
-                self.wins += 1
-            else:
-                self.losses += 1
-            self.total_n_guesses += self.game.guess_n
-            self.avg_n_guesses = float(self.total_n_guesses)/self.n_games
-            self.guess_counts[self.game.guess_n] += 1
-            self.game.reset()
+    def simulate_all_games(self, n_workers: int = 1, show_progress: bool = True) -> None:
+        """Simulate all possible wordle games, one per remaining answer word
+
+        Each answer is played exactly once and results are recorded in sorted
+        answer order, so a parallel run matches a serial run exactly, and every
+        played answer is excluded from later games either way.
+
+        Workers are handed answers grouped by their feedback to the first guess, so
+        games that reach the same positions share one worker's guess cache. Each
+        worker still loads its own dictionary and warms its own caches, so for the
+        shipped dictionaries on a few cores simulate_all_games_by_partition is faster.
+        Workers write solver results to the result store just as a serial run does.
+
+        Keyword arguments:
+        - n_workers: number of processes to spread the games over
+        - show_progress: draw a progress bar
+        """
+        from tqdm import tqdm
+
+        answers: list = sorted(self.game.original_answer_words - self.game.excluded_answers)
+        if n_workers > 1:
+            chunk_size: int = max(1, len(answers) // (n_workers * 8))
+            with ProcessPoolExecutor(max_workers=n_workers,
+                                     initializer=_setup_worker_game,
+                                     initargs=(self.game.original_answer_words,
+                                               self.game.original_allowed_words,
+                                               self.game.use_hints,
+                                               self.game.lookahead_top_k,
+                                               self.game.lookahead_seconds,
+                                               self.game.first_guess,
+                                               self.game.prefilter_top_m,
+                                               self.game.use_opening_book,
+                                               self.game.sample_size,
+                                               self.game.sample_seed,
+                                               self.game.save_solver_results)) as pool:
+                game_guesses: dict = dict(tqdm(pool.map(_play_worker_game, self.__group_by_first_feedback(answers),
+                                                        chunksize=chunk_size),
+                                               total=len(answers), disable=not show_progress))
+            for answer in answers:
+                self.__record_game(answer, game_guesses[answer])
+            # the workers' games don't touch this game, drop their answers as play_and_drop_answer does
+            self.game.exclude_answers(answers)
+        else:
+            for answer in tqdm(answers, total=len(answers), disable=not show_progress):
+                self.game.play_answer(answer)
+                self.__record_game(answer, list(self.game.used_guesses))
+                self.game.reset()
+
+    def __group_by_first_feedback(self, answers: list) -> list:
+        """answers in order of the pattern they give the solver's first guess, alphabetical within a pattern"""
+        game: Wordle = self.game
+        solver: WordleSolver = WordleSolver(answer_words=game.original_answer_words,
+                                            allowed_words=game.original_allowed_words,
+                                            guess_n=1,
+                                            game_answer=None,
+                                            show_output=False,
+                                            pattern_matrix=game.pattern_matrix,
+                                            first_guess=game.first_guess,
+                                            use_opening_book=game.use_opening_book)
+        first_guess: str = solver.get_optimal_guess()
+        patterns: list = [game.pattern_matrix.get_pattern(first_guess, answer) for answer in answers]
+        return [answers[i] for i in np.argsort(patterns, kind="stable")]
+
+    def simulate_all_games_by_partition(self) -> None:
+        """Simulate every remaining answer at once, with exactly the results of simulate_all_games
+
+        Answers that got the same feedback so far leave the game in the same position, so the
+        solver picks one guess for the whole group, and the group is then split by the pattern
+        each answer gives that guess. Every position is solved once instead of once per answer.
+        Answers with a saved game in the result store replay their own guesses, so they're
+        still played one by one.
+        """
+        game: Wordle = self.game
+        pattern_matrix: PatternMatrix = game.pattern_matrix
+        answers: list = sorted(game.original_answer_words - game.excluded_answers)
+        solver: WordleSolver = WordleSolver(answer_words=game.original_answer_words,
+                                            allowed_words=game.original_allowed_words,
+                                            guess_n=1,
+                                            game_answer=None,
+                                            show_output=False,
+                                            pattern_matrix=pattern_matrix,
+                                            n_workers=game.n_scoring_workers,
+                                            lookahead_top_k=game.lookahead_top_k,
+                                            lookahead_seconds=game.lookahead_seconds,
+                                            first_guess=game.first_guess,
+                                            prefilter_top_m=game.prefilter_top_m,
+                                            use_opening_book=game.use_opening_book,
+                                            sample_size=game.sample_size,
+                                            sample_seed=game.sample_seed)
+        saved_answers: set = set()
+        if solver.has_results():
+            saved_answers: set = {answer for answer in answers
+                                  if len(solver.get_result_store().get_guesses(answer)) > 0}
+
+        # only the played answers are followed, but every original answer stays a candidate
+        is_played: np.ndarray = np.zeros(len(pattern_matrix.answer_words), dtype=bool)
+        is_played[pattern_matrix.get_answer_ids([a for a in answers if a not in saved_answers])] = True
+        game_guesses: dict = dict()
+        if is_played.any():
+            self.__play_group(solver, np.arange(len(pattern_matrix.answer_words)), is_played,
+                              game.word_index.all_bits, [], game_guesses)
+
+        for answer in answers:
+            if answer in saved_answers:
+                game.play_answer(answer)
+                game_guesses[answer] = list(game.used_guesses)
+                game.reset()
+            self.__record_game(answer, game_guesses[answer])
+        # played answers are dropped from the pool, as play_and_drop_answer does
+        game.exclude_answers(answers)
+
+    def __play_group(self,
+                     solver: WordleSolver,
+                     answer_ids: np.ndarray,
+                     is_played: np.ndarray,
+                     allowed_bits: int,
+                     guess_patterns: list,
+                     game_guesses: dict) -> None:
+        """play the next guess of a position shared by a group of answers, then follow each feedback group
+
+        Keyword arguments:
+        - solver: solver reused for every position
+        - answer_ids: pattern matrix columns of the position's candidate answers
+        - is_played: per answer column, whether its game is being simulated
+        - allowed_bits: word index bitset of the position's allowed guesses
+        - guess_patterns: (guess, pattern code) of every row so far
+        - game_guesses: where every finished game's guesses are collected
+        """
+        game: Wordle = self.game
+        pattern_matrix: PatternMatrix = game.pattern_matrix
+        solver._Wordle__update_solver_info(answer_words=WordSubset(game.dictionary,
+                                                                   pattern_matrix.answer_rows[answer_ids]),
+                                           allowed_words=game.word_index.get_words(allowed_bits),
+                                           guess_n=len(guess_patterns) + 1,
+                                           guess_patterns=guess_patterns)
+        guess: str = solver.get_optimal_guess()
+        guesses: list = [played_guess for played_guess, _ in guess_patterns] + [guess]
+        patterns: np.ndarray = np.asarray(pattern_matrix.matrix[pattern_matrix.allowed_words.get_id(guess),
+                                                                answer_ids])
+
+        for pattern in np.unique(patterns):
+            group_ids: np.ndarray = answer_ids[patterns == pattern]
+            if not is_played[group_ids].any():
+                continue
+            if pattern == 0 or len(guesses) == Wordle.MAX_GUESS_N:
+                # solved, or out of guesses for every answer left
+                for answer_id in group_ids[is_played[group_ids]]:
+                    game_guesses[pattern_matrix.answer_words[answer_id]] = list(guesses)
+                continue
+            group_allowed_bits: int = allowed_bits
+            for letter in get_absent_letters(guess, int(pattern)):
+                group_allowed_bits &= ~game.word_index.with_letter(letter)
+            self.__play_group(solver, group_ids, is_played, group_allowed_bits,
+                              guess_patterns + [(guess, int(pattern))], game_guesses)
+
+    def __record_game(self, answer: str, guesses: list) -> None:
+        """fold a single finished game into the running statistics"""
+        self.n_games += 1
+        if guesses[-1] == answer:
+            self.wins += 1
+        else:
+            self.losses += 1
+        self.total_n_guesses += len(guesses)
+        self.avg_n_guesses = float(self.total_n_guesses)/self.n_games
+        self.guess_counts[len(guesses)] += 1
+        self.game_guesses[answer] = guesses
+
+
+class SimulateMultiBoardStats:
+    """Simulate multi-board games against seeded random answers and collect statistics"""
+
+    def __init__(self, game: MultiBoardWordle) -> None:
+        self.game: MultiBoardWordle = game
+        self.n_games: int = 0
+        self.wins: int = 0
+        self.losses: int = 0
+        self.avg_n_guesses: float = 0
+        self.total_n_guesses: int = 0
+        self.guess_counts: dict = {i: 0 for i in range(1, game.max_guess_n + 1)}
+        # boards solved by a lost game, 0 to n_boards - 1
+        self.loss_solved_boards: dict = {i: 0 for i in range(game.n_boards)}
+        # where {(answer_1, ..., answer_n): [guess1, guess2, ..., final_guess]}
+        self.game_guesses: dict = dict()
+
+    def simulate_games(self, n_games: int, seed: int = None, show_progress: bool = True) -> None:
+        """Simulate n_games games, each against n_boards different answers drawn from a seeded RNG
+
+        Keyword arguments:
+        - n_games: number of games to play
+        - seed: seed of the answer draws, so runs can be compared
+        - show_progress: draw a progress bar
+        """
+        from tqdm import tqdm
+
+        rng: random.Random = random.Random(seed)
+        answers: list = sorted(self.game.original_answer_words)
+        for _ in tqdm(range(n_games), total=n_games, disable=not show_progress):
+            game_answers: list = rng.sample(answers, self.game.n_boards)
+            self.game.play_answers(game_answers)
+            self.__record_game(game_answers, list(self.game.used_guesses))
+
+    def __record_game(self, answers: list, guesses: list) -> None:
+        """fold a single finished game into the running statistics"""
+        self.n_games += 1
+        if self.game.is_solved:
+            self.wins += 1
+        else:
+            self.losses += 1
+            self.loss_solved_boards[sum(guess_n > 0 for guess_n in self.game.solved_guess_ns)] += 1
+        self.total_n_guesses += len(guesses)
+        self.avg_n_guesses = float(self.total_n_guesses) / self.n_games
+        self.guess_counts[len(guesses)] += 1
+        self.game_guesses[tuple(answers)] = guesses